@@ -6,55 +6,92 @@
 # ============================================
 
 import asyncio
+import collections
+import concurrent.futures
+import copy
+import functools
+import hashlib
+import itertools
 import json
 import os
+import queue
+import re
+import sqlite3
 import threading
+import time
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, simpledialog, filedialog
+from tkinter import ttk, scrolledtext, messagebox, simpledialog
+from tkinter import font as tkfont
 
-from telethon import TelegramClient
-from telethon.errors import ChannelPrivateError, ChatAdminRequiredError, ApiIdInvalidError
-from telethon.sessions import SQLiteSession
-from telethon.tl.functions.channels import GetForumTopicsRequest
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него работаем на стандартном json
+    orjson = None
 
 
 # ============================================
 # DEDICATED TELETHON WORKER (single client/loop)
 # ============================================
 class TelethonWorker:
+    # Порог предупреждения asyncio о долгом шаге цикла (только в режиме отладки)
+    SLOW_CALLBACK_WARN = 0.05
+    # Максимальный размер пакета вызовов, забираемых диспетчером за одно пробуждение
+    DISPATCH_BATCH = 64
+
     def __init__(self):
         self.thread = None
         self.loop = None
         self.client = None
-        self.lock = None
         self._ready = threading.Event()
+        self._incoming = queue.Queue()
+        self._wakeup = None
+        self._wake_pending = False
+        self._error = None
+        self._state_lock = threading.Lock()
+        # цикл держит на задачи только слабые ссылки: сильные храним здесь до завершения задачи
+        self._tasks = set()
+
+    @property
+    def is_ready(self):
+        """Клиент авторизован и воркер принимает вызовы (без запуска входа)."""
+        return self.thread is not None and self._ready.is_set() and self._error is None
 
     def start(self, app):
-        if self.thread is not None:
-            return
+        """
+        Запускает поток воркера и авторизацию клиента и сразу возвращается: вызовы, отправленные
+        через submit до окончания входа, подождут готовности клиента в очереди.
+        """
+        if self.thread is None:
+            self._launch(app)
 
+    def _launch(self, app):
         self._ready.clear()
-        exception_holder = {}
+        self._error = None
+        # новый воркер — это перезапуск или смена аккаунта: сущности и их access_hash от прежнего клиента не годятся
+        _entity_cache.clear()
+        # цикл и примитивы создаем заранее, чтобы submit работал еще до завершения входа
+        self.loop = asyncio.new_event_loop()
+        # в режиме отладки asyncio (PYTHONASYNCIODEBUG=1) предупреждает о шагах дольше порога
+        self.loop.slow_callback_duration = self.SLOW_CALLBACK_WARN
+        self._wakeup = asyncio.Event()
 
         def runner():
+            asyncio.set_event_loop(self.loop)
             try:
-                self.loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(self.loop)
-                self.lock = asyncio.Lock()
-
                 async def _ensure_client():
                     self.client = await init_client(app, app.config["api_id"], app.config["api_hash"],
                                                     app.config["phone"])
 
                 self.loop.run_until_complete(_ensure_client())
             except Exception as exc:
-                exception_holder['exc'] = exc
+                self._fail_pending(exc)
+                self.loop.close()
                 self._ready.set()
                 return
 
             self._ready.set()
             try:
-                self.loop.run_forever()
+                self.loop.run_until_complete(self._dispatcher())
             finally:
                 try:
                     pending = asyncio.all_tasks(loop=self.loop)
@@ -74,29 +111,83 @@ class TelethonWorker:
 
         self.thread = threading.Thread(target=runner, name="TelethonWorker", daemon=True)
         self.thread.start()
-        self._ready.wait()
 
-        if 'exc' in exception_holder:
+    def _fail_pending(self, exc):
+        # вход не удался: все ожидающие и будущие вызовы завершаются этой же ошибкой
+        with self._state_lock:
+            self._error = exc
+            while True:
+                try:
+                    _factory, fut = self._incoming.get_nowait()
+                except queue.Empty:
+                    break
+                if fut.set_running_or_notify_cancel():
+                    fut.set_exception(exc)
+
+    async def _dispatcher(self):
+        """
+        Пакетный цикл воркера: забирает все накопившиеся вызовы из очереди, запускает их задачами
+        и отдает управление циклу, чтобы опрос сети чередовался с запросами из GUI.
+        """
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            with self._state_lock:
+                self._wake_pending = False
+            batch = []
             try:
-                self.thread.join(timeout=0.1)
-            except Exception:
+                while len(batch) < self.DISPATCH_BATCH:
+                    batch.append(self._incoming.get_nowait())
+            except queue.Empty:
                 pass
-            self.thread = None
-            self.loop = None
-            self.client = None
-            self.lock = None
-            raise exception_holder['exc']
+            else:
+                # пакет заполнен, а в очереди еще есть вызовы — заберем их на следующем тике
+                self._wakeup.set()
+
+            for job in batch:
+                task = self.loop.create_task(self._run_job(*job))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            await asyncio.sleep(0)
+
+    async def _run_job(self, coro_factory, fut):
+        # Общей блокировки нет: клиент Telethon рассчитан на параллельные запросы в одном цикле,
+        # поэтому независимые вызовы из GUI выполняются одновременно, а не друг за другом.
+        if not fut.set_running_or_notify_cancel():
+            return
+        try:
+            result = await coro_factory(self.client)
+        except asyncio.CancelledError:
+            fut.set_exception(RuntimeError("TelethonWorker остановлен"))
+            raise
+        except Exception as exc:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
 
-    def call(self, coro_factory):
+    def submit(self, coro_factory):
+        """Ставит корутину в очередь воркера и сразу возвращает concurrent.futures.Future."""
         if self.thread is None:
             raise RuntimeError("TelethonWorker не запущен. Вызовите start(app).")
-
-        async def _run_serialized():
-            async with self.lock:
-                return await coro_factory(self.client)
-
-        fut = asyncio.run_coroutine_threadsafe(_run_serialized(), self.loop)
-        return fut.result()
+        fut = concurrent.futures.Future()
+        with self._state_lock:
+            if self._error is not None:
+                fut.set_exception(self._error)
+                return fut
+            self._incoming.put((coro_factory, fut))
+            # вызовы, пришедшие до того как диспетчер проснулся, попадут в тот же пакет:
+            # на всю пачку — одно обращение к циклу из чужого потока
+            if not self._wake_pending:
+                self._wake_pending = True
+                self.loop.call_soon_threadsafe(self._wakeup.set)
+        return fut
+
+    def submit_pool(self, coro_factories, limit=16, return_exceptions=False):
+        """
+        Запускает независимые запросы одновременно, но не более limit сразу, без общей блокировки:
+        Telethon сам мультиплексирует запросы в одном соединении. Порядок результатов сохраняется.
+        """
+        return self.submit(lambda c: _run_pool(c, coro_factories, limit, return_exceptions))
 
 
 TG_WORKER = TelethonWorker()
@@ -104,8 +195,9 @@ TG_WORKER = TelethonWorker()
 # ============================================
 # ЛОГИРОВАНИЕ
 # ============================================
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -115,24 +207,90 @@ _logger = logging.getLogger("app")
 _logger.setLevel(logging.INFO)
 _handler = RotatingFileHandler(LOG_PATH, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
 _handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+# В файл пишет фоновый поток слушателя: логгер в цикле воркера и в Tk только кладет запись в очередь
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _handler)
 if not _logger.handlers:
-    _logger.addHandler(_handler)
+    _logger.addHandler(QueueHandler(_log_queue))
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
 
 # ============================================
 # КОНФИГУРАЦИЯ
 # ============================================
 USER_CONFIG = "config.json"
 APP_DATA_FILE = "app_data.json"
+# app_data пишется компактно; TG_SENDER_PRETTY_JSON=1 включает отступы для чтения файла глазами
+PRETTY_JSON = os.environ.get("TG_SENDER_PRETTY_JSON") == "1"
+# Сколько запросов тем держать в работе одновременно при поиске по всем группам
+TOPICS_POOL_LIMIT = 16
+# Размер страницы при постраничной загрузке тем форума (100 — максимум, который отдает Telegram)
+TOPICS_PAGE_SIZE = 100
+# Сколько групп передавать в окно за раз при загрузке списка диалогов
+GROUPS_BATCH_SIZE = 50
+
+
+def _read_json(path):
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dump_json(data, pretty=True):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0))
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_json(path, payload):
+    """Атомарная запись: сначала во временный файл, затем замена, чтобы сбой не оставил файл наполовину."""
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        # недописанный временный файл не оставляем рядом с данными
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Последняя запись по пути: path -> (хэш содержимого, st_mtime_ns файла сразу после записи)
+_saved_stamps = {}
+
+
+def _write_json_if_changed(path, payload):
+    """
+    Пишет payload, только если он отличается от последней записи или файл с тех пор изменили
+    снаружи (сверка по mtime). Возвращает True, если запись была.
+    """
+    digest = hashlib.blake2b(payload, digest_size=8).digest()
+    stamp = _saved_stamps.get(path)
+    if stamp is not None and stamp[0] == digest:
+        try:
+            if os.stat(path).st_mtime_ns == stamp[1]:
+                return False
+        except OSError:
+            pass
+    _write_json(path, payload)
+    _saved_stamps[path] = (digest, os.stat(path).st_mtime_ns)
+    return True
 
 
 def load_config():
     defaults = {"api_id": "", "api_hash": "", "phone": "", "rate_delay": 10.0}
     if os.path.exists(USER_CONFIG):
         try:
-            with open(USER_CONFIG, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                defaults.update(data)
-                return defaults
+            data = _read_json(USER_CONFIG)
+            defaults.update(data)
+            return defaults
         except (json.JSONDecodeError, IOError):
             pass
     return defaults
@@ -140,44 +298,104 @@ def load_config():
 
 def save_config(api_id, api_hash, phone, rate_delay):
     config = {"api_id": api_id, "api_hash": api_hash, "phone": phone, "rate_delay": rate_delay}
-    with open(USER_CONFIG, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    _write_json_if_changed(USER_CONFIG, _dump_json(config))
+
+
+# Версия формата app_data: файлы с версией ниже проходят миграцию при загрузке и сохраняются заново
+APP_DATA_SCHEMA = 1
+
+
+def _migrate_app_data(data):
+    """Приводит группы и темы старых версий файла к текущему виду (поле cabinet -> client_number и т.п.)."""
+    for item_list in ("groups", "themes"):
+        for item in data[item_list]:
+            if 'client_number' not in item:
+                item['client_number'] = item.pop('cabinet', "")
+            item.setdefault('name', "")
+            if not isinstance(item.get('custom_templates'), dict):
+                item['custom_templates'] = {}
+    data['_schema_version'] = APP_DATA_SCHEMA
 
 
 def load_app_data():
-    defaults = {"groups": [], "themes": [], "tags": [], "templates": []}
+    defaults = {"groups": [], "themes": [], "tags": [], "templates": [], "_schema_version": APP_DATA_SCHEMA}
     if os.path.exists(APP_DATA_FILE):
         try:
-            with open(APP_DATA_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for k, v in defaults.items():
-                    if k not in data:
-                        data[k] = v
-                for item_list in ("groups", "themes"):
-                    for item in data.get(item_list, []):
-                        if 'client_number' not in item:
-                            item['client_number'] = item.pop('cabinet', "")
-                        if 'name' not in item:
-                            item['name'] = ""
-                        if 'custom_templates' not in item or not isinstance(item.get('custom_templates'), dict):
-                            item['custom_templates'] = {}
-                return data
+            # Файл читается целиком одним вызовом orjson: это быстрее потокового разбора (ijson) даже для
+            # тысяч групп, а окну все равно нужны все списки сразу (теги, группы и темы на вкладке отправки).
+            data = _read_json(APP_DATA_FILE)
+            # уже приведенный файл не обходим поэлементно на каждом запуске
+            outdated = data.get('_schema_version', 0) < APP_DATA_SCHEMA
+            for k, v in defaults.items():
+                data.setdefault(k, v)
+            if outdated:
+                _migrate_app_data(data)
+                try:
+                    save_app_data(data)
+                except OSError as e:
+                    # не сохранили — миграция просто повторится при следующем запуске
+                    _logger.warning("Не удалось сохранить %s после миграции: %s", APP_DATA_FILE, e)
+            return data
         except (json.JSONDecodeError, IOError):
             pass
     return defaults
 
 
+def _log_save_error(fut):
+    if (exc := fut.exception()) is not None:
+        _logger.error("Не удалось сохранить %s: %s", APP_DATA_FILE, exc)
+
+
 def save_app_data(data):
-    with open(APP_DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # сохранение без изменений не трогает диск
+    _write_json_if_changed(APP_DATA_FILE, _dump_json(data, pretty=PRETTY_JSON))
 
 
 # ============================================
 # TELEGRAM
 # ============================================
+# Кэш сущностей групп: group_id -> (время получения, entity). Используется только из цикла воркера.
+ENTITY_CACHE_TTL = 300
+_entity_cache = {}
+
+
+async def _resolve_entity(client, group_id):
+    now = time.monotonic()
+    hit = _entity_cache.get(group_id)
+    if hit and now - hit[0] < ENTITY_CACHE_TTL:
+        return hit[1]
+    entity = await client.get_entity(group_id)
+    _entity_cache[group_id] = (now, entity)
+    return entity
+
+
+# Настройки SQLite для файла сессии: WAL и synchronous=NORMAL убирают fsync на каждую запись сущности,
+# mmap_size позволяет читать файл через отображение в память, без копирования страниц в буфер SQLite
+SESSION_DB_PRAGMAS = ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL", "PRAGMA temp_store=MEMORY",
+                      "PRAGMA mmap_size=268435456")
+
+
+def _tune_session_db(session):
+    try:
+        c = session._cursor()
+        for pragma in SESSION_DB_PRAGMAS:
+            c.execute(pragma)
+        c.close()
+    except sqlite3.Error:
+        _logger.warning("Не удалось применить настройки SQLite к файлу сессии", exc_info=True)
+
+
 async def init_client(app, api_id, api_hash, phone):
     session_name = f"session_{phone.strip().replace('+', '')}"
+    # Telethon импортируется при первом подключении, а не при старте окна
+    from telethon import TelegramClient
+    from telethon.sessions import SQLiteSession
+
+    # Сессия остается в SQLite, а не в памяти: в ней между запусками хранятся access_hash сохраненных групп,
+    # без которых отправка по числовому ID не работает. Записи сущностей Telethon и так фиксирует
+    # пакетно (commit раз в минуту), а fsync на каждую запись снимают SESSION_DB_PRAGMAS.
     session = SQLiteSession(session_name)
+    _tune_session_db(session)
     local_client = TelegramClient(session, api_id, api_hash)
 
     def code_callback():
@@ -196,52 +414,198 @@ async def init_client(app, api_id, api_hash, phone):
     return local_client
 
 
-async def get_user_groups(client):
-    groups = []
-    async for dialog in client.iter_dialogs():
-        if dialog.is_group or dialog.is_channel:
-            groups.append({
-                "id": dialog.id,
-                "name": dialog.title,
-                "username": getattr(dialog.entity, 'username', "")
-            })
-    return groups
+async def _run_pool(client, factories, limit=16, return_exceptions=False):
+    """
+    Пул корутин: держит в работе до limit запросов, запуская следующий по мере завершения предыдущих.
+    Результаты возвращаются в порядке factories.
+    """
+    sem = asyncio.Semaphore(limit)
+
+    async def _wrap(f):
+        async with sem:
+            return await f(client)
+
+    return await asyncio.gather(*(_wrap(f) for f in factories), return_exceptions=return_exceptions)
+
 
+# Рассылка идет от пользовательского аккаунта, а не бота: не больше двух отправок в работе
+# и не чаще одной в SEND_MIN_INTERVAL секунд, даже при нулевой задержке в настройках
+SEND_CONCURRENCY = 2
+SEND_MIN_INTERVAL = 1.0
+
+
+class _RateLimiter:
+    """
+    Планировщик по срокам для корутин одного цикла: acquire() пропускает не чаще rate раз в секунду.
+    Каждый вызов сразу занимает следующий свободный слот и спит только до него, без общей блокировки.
+    pause() сдвигает все слоты, например на время FloodWait.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self._next = time.monotonic()
+        self._resume_at = 0.0
+
+    def pause(self, seconds):
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            slot = max(now, self._next, self._resume_at)
+            self._next = slot + self.interval
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            # пауза, объявленная пока ждали, отменяет занятый слот — занимаем новый после нее
+            if time.monotonic() >= self._resume_at:
+                return
 
-async def get_group_topics(client, group_id):
+
+def _entity_username(entity):
+    # у Channel поле username есть всегда (часто None), у обычного Chat его нет вовсе
+    try:
+        return entity.username or ""
+    except AttributeError:
+        return ""
+
+
+async def iter_user_groups(client, batch=GROUPS_BATCH_SIZE):
+    """Отдает группы и каналы пользователя пачками по batch штук, по мере прихода страниц диалогов."""
+    chunk = []
+    now = time.monotonic()
+    # старые группы, преобразованные в супергруппы, пропускаются: их место в списке заняла супергруппа
+    async for d in client.iter_dialogs(ignore_migrated=True):
+        if not (d.is_group or d.is_channel):
+            continue
+        # сущность уже пришла вместе с диалогом — кладем ее в кэш, чтобы поиск тем не запрашивал ее снова
+        _entity_cache[d.id] = (now, d.entity)
+        chunk.append({"id": d.id, "name": d.title, "username": _entity_username(d.entity)})
+        if len(chunk) >= batch:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@functools.lru_cache(maxsize=None)
+def _topics_request_proto(limit):
+    """Заготовка GetForumTopicsRequest с постоянными полями; создается один раз на размер страницы."""
+    from telethon.tl.functions.channels import GetForumTopicsRequest
+    return GetForumTopicsRequest(channel=None, offset_date=0, offset_id=0, offset_topic=0, limit=limit)
+
+
+async def iter_group_topics(client, group_id, page=TOPICS_PAGE_SIZE):
+    """
+    Постранично отдает открытые темы группы-форума (списки словарей по page штук).
+    Для обычной группы ничего не отдает; ошибки Telegram пробрасываются вызывающему.
+    """
+    entity = await _resolve_entity(client, group_id)
+    if not getattr(entity, 'forum', False):
+        return
+    # один объект запроса на группу: для следующих страниц меняются только смещения
+    request = copy.copy(_topics_request_proto(page))
+    request.channel = entity
+    while True:
+        result = await client(request)
+        yield [{"topic_id": t.id, "name": t.title} for t in result.topics if
+               not (getattr(t, 'closed', True) or (t.hidden and t.id != 1))]
+        if len(result.topics) < page:
+            break
+        # смещение следующей страницы — дата и id верхнего сообщения последней темы, а не дата её создания;
+        # у удаленной темы (ForumTopicDeleted) верхнего сообщения нет, берем последнюю живую
+        last = next((t for t in reversed(result.topics) if getattr(t, 'top_message', 0)), None)
+        if last is None:
+            break
+        top = next((m for m in result.messages if m.id == last.top_message), None)
+        offset = (getattr(top, 'date', None) or 0, last.top_message, last.id)
+        # смещение не сдвинулось — следующая страница повторила бы эту же: выходим, а не крутимся
+        if offset == (request.offset_date, request.offset_id, request.offset_topic):
+            break
+        request.offset_date, request.offset_id, request.offset_topic = offset
+        # точка переключения между страницами, чтобы не держать цикл воркера
+        await asyncio.sleep(0)
+
+
+_TOPIC_ACCESS_ERROR = "Ошибка доступа: проверьте, что вы состоите в группе и у вас есть права на просмотр."
+
+
+@functools.lru_cache(maxsize=None)
+def _topic_error_map():
+    """Тип исключения -> сообщение об ошибке загрузки тем. Строится при первой ошибке (Telethon импортируется лениво)."""
+    from telethon.errors import ChannelPrivateError, ChatAdminRequiredError
+    return {
+        ValueError: "Неверный ID группы: {group_id}",
+        TypeError: "Неверный ID группы: {group_id}",
+        ChannelPrivateError: _TOPIC_ACCESS_ERROR,
+        ChatAdminRequiredError: _TOPIC_ACCESS_ERROR,
+    }
+
+
+def _topic_error_template(exc):
+    # поиск по MRO сохраняет семантику isinstance для подклассов
+    error_map = _topic_error_map()
+    return next((error_map[cls] for cls in type(exc).__mro__ if cls in error_map), None)
+
+
+def describe_topic_error(exc, group_id):
+    """Текст ошибки загрузки тем группы для пользователя."""
+    msg = _topic_error_template(exc)
+    if msg is None:
+        return f"Неизвестная ошибка: {describe_error(exc)}"
+    return msg.format(group_id=group_id)
+
+
+def describe_error(exc):
+    """Текст ошибки Telegram для пользователя."""
     try:
-        entity = await client.get_entity(group_id)
-        if not getattr(entity, 'forum', False):
-            return [], "Это не группа-форум, или темы отключены."
-        result = await client(
-            GetForumTopicsRequest(channel=entity, offset_date=0, offset_id=0, offset_topic=0, limit=100))
-        topics = [{"topic_id": t.id, "name": t.title} for t in result.topics if
-                  not (t.closed or (t.hidden and t.id != 1))]
-        return topics, None
-    except (ValueError, TypeError):
-        return [], f"Неверный ID группы: {group_id}"
-    except (ChannelPrivateError, ChatAdminRequiredError):
-        return [], "Ошибка доступа: проверьте, что вы состоите в группе и у вас есть права на просмотр."
-    except Exception as e:
-        return [], f"Неизвестная ошибка: {e}"
+        from telethon.errors import ApiIdInvalidError
+    except ImportError:
+        return str(exc)
+    if isinstance(exc, ApiIdInvalidError):
+        return "Некорректные API ID или API Hash."
+    return str(exc)
+
+
+def _worker_needs_restart(worker, exc):
+    """
+    Нужно ли пересоздавать воркер после ошибки: да, если вход не удался или ошибка касается
+    авторизации или файла сессии. Ошибки отдельного запроса (неверный получатель и т.п.) воркер не трогают.
+    """
+    if not worker.is_ready:
+        return True
+    try:
+        from telethon.errors import ApiIdInvalidError, AuthKeyError, UnauthorizedError
+    except ImportError:
+        return True
+    return isinstance(exc, (ApiIdInvalidError, AuthKeyError, UnauthorizedError, sqlite3.DatabaseError))
 
 
 # ============================================
 # GUI ПРИЛОЖЕНИЕ
 # ============================================
 class TelegramSenderApp:
+    LOG_MAX_LINES = 2000
+    LOG_FLUSH_MS = 100
+    # сколько результатов replace_vars хранить до сброса кэша значений параметров
+    RENDERED_MAX = 512
+    BUTTON_STYLES = {
+        'primary': 'Btn.Primary.TButton', 'success': 'Btn.Success.TButton',
+        'danger': 'Btn.Danger.TButton', 'secondary': 'Btn.Secondary.TButton',
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("Telegram Sender Pro")
 
-        screen_width = root.winfo_screenwidth()
-        screen_height = root.winfo_screenheight()
-        window_width = int(screen_width * 0.5)
-        window_height = int(screen_height * 0.5)
+        # размеры экрана запрашиваются один раз; диалоги центрируются по ним же
+        self.screen_w = screen_width = root.winfo_screenwidth()
+        self.screen_h = screen_height = root.winfo_screenheight()
+        window_width = screen_width >> 1
+        window_height = screen_height >> 1
         x = (screen_width - window_width) // 2
         y = (screen_height - window_height) // 2
         self.root.geometry(f"{window_width}x{window_height}+{x}+{y}")
-        self.root.minsize(int(screen_width * 0.2), int(screen_height * 0.2))
+        self.root.minsize(screen_width // 5, screen_height // 5)
 
         self.colors = {
             'bg': '#f8fafc', 'card': '#ffffff', 'primary': '#3b82f6', 'primary_hover': '#2563eb',
@@ -251,41 +615,156 @@ class TelegramSenderApp:
             'input_bg': '#ffffff', 'input_fg': '#0f172a', 'tag_filter_bg': '#f1f5f9', 'hover': '#f1f5f9'
         }
         self.root.configure(bg=self.colors['bg'])
+        self._rgb_cache = {}
+        # шрифты создаются один раз; виджеты ссылаются на готовые именованные шрифты Tk
+        self._fonts = {
+            'small': tkfont.Font(family='Segoe UI', size=9),
+            'small_italic': tkfont.Font(family='Segoe UI', size=9, slant='italic'),
+            'body': tkfont.Font(family='Segoe UI', size=10),
+            'bold': tkfont.Font(family='Segoe UI', size=10, weight='bold'),
+            'title': tkfont.Font(family='Segoe UI', size=11, weight='bold'),
+            'heading': tkfont.Font(family='Segoe UI', size=12, weight='bold'),
+            'display': tkfont.Font(family='Segoe UI', size=14, weight='bold'),
+            'mono': tkfont.Font(family='Consolas', size=9),
+        }
+        self._style = ttk.Style()
         self._setup_base_styles()
 
         self.is_sending = False
+        self._counter_after = None
+        self._data_hashes = {}
+        # строки, показанные сейчас в списках вкладки управления: путь виджета -> список строк
+        self._shown_lines = {}
+        self._entries = {}
+        self._vars_cache = None
+        self._vars_pattern = None
+        self._rendered = {}
+        self._var_buttons = []
+        self._var_buttons_after = None
+        self._filter_muted = False
+        self._last_active_tags = None
+        self._filter_after = None
+        self._row_seq = itertools.count()
+        self._log_lock = threading.Lock()
+        # строки сверх LOG_MAX_LINES все равно были бы срезаны при выводе — в буфере их не держим
+        self._log_pending = collections.deque(maxlen=self.LOG_MAX_LINES)
         self.config = load_config()
         self.app_data = load_app_data()
+        # шаблоны по имени; поддерживается вместе со списком app_data["templates"]
+        self._templates_by_name = {t["name"]: t for t in self.app_data["templates"]}
+        # множество тегов для проверки существования; поддерживается вместе со списком app_data["tags"]
+        self._tags_set = set(self.app_data["tags"])
+        self._reindex_tags()
+        # запись app_data на диск: отложенно и в отдельном потоке, чтобы не блокировать Tk
+        self._save_after = None
+        self._save_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="app-data")
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._fetch_cancel = threading.Event()
         self.fetched_groups = []
         self.fetched_topics = []
 
         self.root.grid_rowconfigure(0, weight=1)
         self.root.grid_columnconfigure(0, weight=1)
 
+        self._scroll_canvases = set()
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.root.bind_all(sequence, self._on_mousewheel)
+
         self.create_widgets()
         self.load_saved_config()
         self.refresh_all_lists()
+        self.root.after_idle(self._prebuild_next_tab)
+
+    def _center_window(self, window, width, height):
+        window.geometry(f"{width}x{height}+{(self.screen_w - width) // 2}+{(self.screen_h - height) // 2}")
+
+    def _schedule_save(self):
+        """Серия правок подряд записывается на диск одним сохранением через 300 мс после последней."""
+        if self._save_after:
+            self.root.after_cancel(self._save_after)
+        self._save_after = self.root.after(300, self._flush_save)
+
+    def _flush_save(self):
+        self._save_after = None
+        # сериализуем здесь, в поток записи уходят готовые байты: Tk тем временем может менять self.app_data
+        payload = _dump_json(self.app_data, pretty=PRETTY_JSON)
+        fut = self._save_executor.submit(_write_json_if_changed, APP_DATA_FILE, payload)
+        fut.add_done_callback(_log_save_error)
+
+    def _on_close(self):
+        if self._save_after:
+            self.root.after_cancel(self._save_after)
+            self._flush_save()
+        self._save_executor.shutdown(wait=True)
+        # идущая загрузка групп больше не шлет пачки в уничтоженное окно
+        self._fetch_cancel.set()
+        self.root.destroy()
 
     def _setup_base_styles(self):
-        style = ttk.Style()
-        style.theme_use('clam')
-
-        style.configure('TNotebook', background=self.colors['bg'], borderwidth=0, tabmargins=[0, 0, 0, 0])
-        style.configure('TNotebook.Tab', background=self.colors['card'], foreground=self.colors['text_light'],
-                        padding=[24, 14], font=('Segoe UI', 10), borderwidth=0, relief='flat')
-        style.map('TNotebook.Tab', background=[('selected', self.colors['primary'])],
-                  foreground=[('selected', '#ffffff')])
-
-        style.configure('Card.TLabelframe', background=self.colors['card'], bordercolor=self.colors['border'],
-                        borderwidth=1, relief='solid', padding=16)
-        style.configure('Card.TLabelframe.Label', background=self.colors['card'], foreground=self.colors['text'],
-                        font=('Segoe UI', 11, 'bold'))
+        self._build_base_styles()
+        self._setup_class_bindings()
+
+    def _setup_class_bindings(self):
+        # один обработчик на класс вместо замыканий на каждом виджете
+        self.root.bind_class('ThemedCheck', '<Enter>', self._on_check_enter)
+        self.root.bind_class('ThemedCheck', '<Leave>', self._on_check_leave)
+
+        self._ctx_target = None
+        self._ctx_menu = tk.Menu(self.root, tearoff=0, bg=self.colors['card'], fg=self.colors['text'],
+                                 activebackground=self.colors['primary'], activeforeground='#ffffff',
+                                 relief='flat', borderwidth=1)
+        for label, sequence in (("Вырезать", "<<Cut>>"), ("Копировать", "<<Copy>>"), ("Вставить", "<<Paste>>")):
+            self._ctx_menu.add_command(label=label,
+                                       command=lambda seq=sequence: self._ctx_target.event_generate(seq))
+        self.root.bind_class('ContextMenu', '<Button-3>', self._show_context_menu)
+        self.root.bind_class('ContextMenu', '<Control-Button-1>', self._show_context_menu)
+
+    def _on_check_enter(self, event):
+        event.widget.config(fg=self.colors['primary'])
+
+    def _on_check_leave(self, event):
+        event.widget.config(fg=self.colors['text'])
+
+    @staticmethod
+    def _add_bindtag(widget, tag):
+        widget.bindtags(widget.bindtags() + (tag,))
+
+    def _build_base_styles(self):
+        self._style.theme_use('clam')
+        c, f = self.colors, self._fonts
+        self._apply_styles({
+            'TNotebook': {'background': c['bg'], 'borderwidth': 0, 'tabmargins': [0, 0, 0, 0]},
+            'TNotebook.Tab': {'background': c['card'], 'foreground': c['text_light'], 'padding': [24, 14],
+                              'font': f['body'], 'borderwidth': 0, 'relief': 'flat'},
+            'Card.TLabelframe': {'background': c['card'], 'bordercolor': c['border'], 'borderwidth': 1,
+                                 'relief': 'solid', 'padding': 16},
+            'Card.TLabelframe.Label': {'background': c['card'], 'foreground': c['text'],
+                                       'font': f['title']},
+            'Hint.TLabel': {'background': c['card'], 'foreground': c['text_muted'],
+                            'font': f['small_italic'], 'anchor': 'center'},
+            'HintSmall.TLabel': {'background': c['card'], 'foreground': c['text_muted'],
+                                 'font': f['small'], 'anchor': 'center'},
+            'App.TEntry': {'fieldbackground': c['input_bg'], 'foreground': c['input_fg'],
+                           'insertcolor': c['text'], 'bordercolor': c['border'], 'lightcolor': c['border'],
+                           'darkcolor': c['border'], 'padding': 3},
+        }, maps={
+            'App.TEntry': {'bordercolor': [('focus', c['border_focus'])], 'lightcolor': [('focus', c['border_focus'])]},
+            'TNotebook.Tab': {'background': [('selected', c['primary'])], 'foreground': [('selected', '#ffffff')]},
+        })
 
         self._mk_button_styles()
 
+    def _apply_styles(self, configure, maps=None):
+        """Применяет описания стилей одним проходом: {имя стиля: опции} для configure и map."""
+        style = self._style
+        for name, options in configure.items():
+            style.configure(name, **options)
+        for name, options in (maps or {}).items():
+            style.map(name, **options)
+
     def _mk_button_styles(self):
-        style = ttk.Style()
-        base = {'font': ('Segoe UI', 10, 'bold'), 'padding': (18, 12), 'borderwidth': 0, 'relief': 'flat'}
+        base = {'font': self._fonts['bold'], 'padding': (18, 12), 'borderwidth': 0, 'relief': 'flat',
+                'foreground': '#ffffff', 'focuscolor': 'none'}
         variants = {
             'Primary': (self.colors['primary'], self.colors['primary_hover']),
             'Success': (self.colors['success'], self.colors['success_hover']),
@@ -293,84 +772,95 @@ class TelegramSenderApp:
             'Secondary': (self.colors['secondary'], self.colors['secondary_hover']),
         }
 
+        configure, maps = {}, {}
         for name, (color, hover) in variants.items():
-            pressed = self._adjust_color(hover, 0.9)
             stylename = f'Btn.{name}.TButton'
-            style.configure(stylename, background=color, foreground='#ffffff', focuscolor='none', **base)
-            style.map(stylename,
-                      background=[('active', hover), ('pressed', pressed), ('disabled', '#cbd5e1')],
-                      foreground=[('disabled', '#ffffff')])
+            configure[stylename] = dict(base, background=color)
+            maps[stylename] = {
+                'background': [('active', hover), ('pressed', self._adjust_color(hover, 0.9)),
+                               ('disabled', '#cbd5e1')],
+                'foreground': [('disabled', '#ffffff')],
+            }
+        self._apply_styles(configure, maps)
 
     def _adjust_color(self, color, factor=0.9):
+        if len(color) == 7 and color.startswith('#'):
+            try:
+                r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+                return f'#{int(r * factor):02x}{int(g * factor):02x}{int(b * factor):02x}'
+            except ValueError:
+                pass
+        # именованные цвета разрешает Tk; ответ запоминаем, цвет по имени не меняется
         try:
-            r, g, b = [int(x * factor) for x in self.root.winfo_rgb(color)[0:3:1]]
+            rgb = self._rgb_cache.get(color)
+            if rgb is None:
+                rgb = self._rgb_cache[color] = self.root.winfo_rgb(color)
+            r, g, b = [int(x * factor) for x in rgb]
             return f'#{r // 256:02x}{g // 256:02x}{b // 256:02x}'
         except Exception:
             return color
 
     # UI helper: Button creation with styling
     def create_button(self, parent, text, command, variant='primary', **kwargs):
-        style_map = {
-            'primary': 'Btn.Primary.TButton', 'success': 'Btn.Success.TButton',
-            'danger': 'Btn.Danger.TButton', 'secondary': 'Btn.Secondary.TButton',
-        }
-        style_name = style_map.get(str(variant).lower(), 'Btn.Primary.TButton')
-        btn = ttk.Button(parent, text=text, command=command, style=style_name, **kwargs)
-        btn.bind('<Enter>', lambda e: btn.configure(cursor='hand2'))
-        return btn
+        style_name = self.BUTTON_STYLES.get(str(variant).lower(), 'Btn.Primary.TButton')
+        # cursor — опция виджета, а не элемента темы, поэтому задаётся при создании, а не в стиле
+        kwargs.setdefault('cursor', 'hand2')
+        return ttk.Button(parent, text=text, command=command, style=style_name, **kwargs)
 
     # UI helper: Card (LabelFrame) creation
     def create_card(self, parent, title):
         return ttk.LabelFrame(parent, text=title, style='Card.TLabelframe', padding=20)
 
+    # UI helper: Hint label creation
+    def mk_hint(self, parent, text, small=False):
+        """Подсказка приглушённым цветом на фоне карточки; small — обычный, не курсивный шрифт."""
+        return ttk.Label(parent, text=text, style='HintSmall.TLabel' if small else 'Hint.TLabel')
+
+    def _parent_bg(self, parent):
+        """Фон родителя; читается из Tk один раз и запоминается на виджете (фоны карточек не меняются)."""
+        bg = getattr(parent, '_cached_bg', None)
+        if bg is None:
+            try:
+                bg = parent.cget('bg')
+            except tk.TclError:
+                # ttk.Frame/LabelFrame может не иметь опции bg; используем цвет карточки
+                bg = self.colors.get('card', self.colors.get('bg', '#ffffff'))
+            parent._cached_bg = bg
+        return bg
+
     # UI helper: Label creation
     def mk_label(self, parent, text, bold=False, color=None):
         """
         Создает обычный текстовый ярлык, наследуя фон от родителя. Некоторые ttk-виджеты
         (например, LabelFrame) не поддерживают опцию 'bg', поэтому безопасно обрабатываем эту ситуацию.
         """
-        try:
-            bg = parent.cget('bg')
-        except tk.TclError:
-            # ttk.Frame/LabelFrame может не иметь опции bg; используем цвет карточки
-            bg = self.colors.get('card', self.colors.get('bg', '#ffffff'))
         return tk.Label(
             parent,
             text=text,
-            bg=bg,
+            bg=self._parent_bg(parent),
             fg=color or self.colors['text'],
-            font=('Segoe UI', 10, 'bold' if bold else 'normal')
+            font=self._fonts['bold' if bold else 'body']
         )
 
     def add_context_menu(self, widget):
-        menu = tk.Menu(widget, tearoff=0, bg=self.colors['card'], fg=self.colors['text'],
-                       activebackground=self.colors['primary'], activeforeground='#ffffff',
-                       relief='flat', borderwidth=1)
-        menu.add_command(label="Вырезать", command=lambda: widget.event_generate("<<Cut>>"))
-        menu.add_command(label="Копировать", command=lambda: widget.event_generate("<<Copy>>"))
-        menu.add_command(label="Вставить", command=lambda: widget.event_generate("<<Paste>>"))
-
-        def show_menu(e):
-            menu.tk_popup(e.x_root, e.y_root)
+        self._add_bindtag(widget, 'ContextMenu')
 
-        widget.bind("<Button-3>", show_menu)
-        widget.bind("<Control-Button-1>", show_menu)
+    def _show_context_menu(self, event):
+        # одно меню на всё приложение: команды применяются к виджету, на котором его открыли
+        self._ctx_target = event.widget
+        self._ctx_menu.tk_popup(event.x_root, event.y_root)
 
     # UI helper: Entry creation
     def mk_entry(self, parent, **kwargs):
-        entry = tk.Entry(parent, font=('Segoe UI', 10), bg=self.colors['input_bg'], fg=self.colors['input_fg'],
-                         relief='solid', bd=1, insertbackground=self.colors['text'], highlightthickness=2,
-                         highlightbackground=self.colors['border'], highlightcolor=self.colors['border_focus'],
-                         **kwargs)
-        entry.bind('<FocusIn>', lambda e: entry.config(highlightbackground=self.colors['border_focus']))
-        entry.bind('<FocusOut>', lambda e: entry.config(highlightbackground=self.colors['border']))
+        # подсветка рамки при фокусе задаётся стилем App.TEntry
+        entry = ttk.Entry(parent, style='App.TEntry', font=self._fonts['body'], **kwargs)
         self.add_context_menu(entry)
         return entry
 
     # UI helper: Text widget creation
     def mk_text(self, parent, **kwargs):
         frame = tk.Frame(parent, bg=self.colors['border'], bd=1, relief='solid')
-        txt = scrolledtext.ScrolledText(frame, wrap=tk.WORD, font=('Segoe UI', 10),
+        txt = scrolledtext.ScrolledText(frame, wrap=tk.WORD, font=self._fonts['body'],
                                         bg=self.colors['input_bg'], fg=self.colors['input_fg'], relief='flat', bd=0,
                                         insertbackground=self.colors['text'], highlightthickness=0, **kwargs)
         frame.grid_rowconfigure(0, weight=1)
@@ -380,18 +870,19 @@ class TelegramSenderApp:
         return frame, txt
 
     def mk_checkbutton(self, parent, text, var):
-        bg = parent.cget('bg')
-        cb = tk.Checkbutton(parent, text=text, variable=var, bg=bg, fg=self.colors['text'],
-                            selectcolor=self.colors['input_bg'], activebackground=bg,
-                            activeforeground=self.colors['text'], font=('Segoe UI', 9),
+        # вызывается на каждую строку получателей: цвета берём в локальные переменные
+        colors, bg = self.colors, self._parent_bg(parent)
+        text_color = colors['text']
+        cb = tk.Checkbutton(parent, text=text, variable=var, bg=bg, fg=text_color,
+                            selectcolor=colors['input_bg'], activebackground=bg,
+                            activeforeground=text_color, font=self._fonts['small'],
                             relief='flat', borderwidth=0, highlightthickness=0, cursor='hand2')
-        cb.bind('<Enter>', lambda e: cb.config(fg=self.colors['primary']))
-        cb.bind('<Leave>', lambda e: cb.config(fg=self.colors['text']))
+        self._add_bindtag(cb, 'ThemedCheck')
         return cb
 
     def mk_listbox(self, parent):
         frame = tk.Frame(parent, bg=self.colors['card'])
-        listbox = tk.Listbox(frame, font=('Segoe UI', 9), bg=self.colors['input_bg'], fg=self.colors['input_fg'],
+        listbox = tk.Listbox(frame, font=self._fonts['small'], bg=self.colors['input_bg'], fg=self.colors['input_fg'],
                              relief='solid', bd=1, selectbackground=self.colors['primary'],
                              selectforeground='#ffffff', activestyle='none', exportselection=False,
                              highlightthickness=1, highlightbackground=self.colors['border'],
@@ -405,6 +896,14 @@ class TelegramSenderApp:
         scrollbar.grid(row=0, column=1, sticky='ns')
         return frame, listbox
 
+    @staticmethod
+    def _fill_listbox(listbox, lines, append=False):
+        """Заполняет список одним вызовом Tk вместо insert на каждую строку."""
+        if not append:
+            listbox.delete(0, tk.END)
+        if lines:
+            listbox.insert(tk.END, *lines)
+
     def _create_scrollable_area(self, parent):
         container = tk.Frame(parent, bg=self.colors['bg'])
         container.grid_rowconfigure(0, weight=1)
@@ -416,17 +915,61 @@ class TelegramSenderApp:
 
 
         canvas_window = canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        canvas._last_width = -1
+
         def on_canvas_configure(event):
+            # при изменении только высоты ширину окна не трогаем
+            if event.width == canvas._last_width:
+                return
+            canvas._last_width = event.width
             canvas.itemconfig(canvas_window, width=event.width)
         canvas.bind('<Configure>', on_canvas_configure)
 
-        scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        # пересчёт scrollregion откладываем на 50 мс после последнего <Configure>: пока окно тянут,
+        # bbox не считается; для скрытой вкладки он выполнится при её показе (<Map>)
+        pending = []
+
+        def update_scrollregion():
+            pending.clear()
+            canvas.configure(scrollregion=canvas.bbox("all"))
+
+        def schedule_scrollregion(event=None):
+            if not canvas.winfo_ismapped():
+                return
+            if pending:
+                canvas.after_cancel(pending.pop())
+            pending.append(canvas.after(50, update_scrollregion))
+
+        scrollable_frame.bind("<Configure>", schedule_scrollregion)
+        canvas.bind("<Map>", schedule_scrollregion)
         canvas.configure(yscrollcommand=scrollbar.set)
         canvas.grid(row=0, column=0, sticky='nsew')
         scrollbar.grid(row=0, column=1, sticky='nsew')
 
+        self._scroll_canvases.add(str(canvas))
+        canvas.bind('<Destroy>', lambda e: self._scroll_canvases.discard(str(e.widget)), add='+')
         return container, scrollable_frame
 
+    def _on_mousewheel(self, event):
+        # один обработчик колеса на всё приложение: ищем ближайшую прокручиваемую область под курсором
+        try:
+            widget = self.root.winfo_containing(event.x_root, event.y_root)
+        except KeyError:  # служебные окна Tk (например, выпадающий список Combobox)
+            return
+        while widget is not None:
+            if widget.winfo_class() in ('Listbox', 'Text'):
+                return  # у списков и текстовых полей своя прокрутка
+            if str(widget) in self._scroll_canvases:
+                if event.num == 4 or event.delta > 0:
+                    step = -1
+                elif event.num == 5 or event.delta < 0:
+                    step = 1
+                else:
+                    return
+                widget.yview_scroll(step * max(1, abs(event.delta) // 120), 'units')
+                return
+            widget = widget.master
+
     def create_widgets(self):
         main_container = tk.Frame(self.root, bg=self.colors['bg'])
         main_container.grid(row=0, column=0, sticky="nsew", padx=8, pady=8)
@@ -443,10 +986,38 @@ class TelegramSenderApp:
             "  📤  Отправка сообщений  ": self.create_sending_tab
         }
 
+        # сразу строим только первую вкладку, остальные — при первом открытии
+        self._tab_builders = {}
         for text, creator in tabs.items():
             tab_frame = tk.Frame(self.notebook, bg=self.colors['bg'])
             self.notebook.add(tab_frame, text=text)
-            creator(tab_frame)
+            self._tab_builders[str(tab_frame)] = (creator, tab_frame)
+        creator, tab_frame = self._tab_builders.pop(self.notebook.tabs()[0])
+        creator(tab_frame)
+
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+
+    def _lazy_build(self):
+        self._build_tab(self.notebook.select())
+
+    def _build_tab(self, key):
+        builder = self._tab_builders.pop(key, None)
+        if builder is None:
+            return
+        creator, tab_frame = builder
+        started = time.perf_counter()
+        creator(tab_frame)
+        self._refresh_listboxes()
+        _logger.debug("Вкладка %s построена за %.1f мс", creator.__name__, (time.perf_counter() - started) * 1000)
+
+    def _prebuild_next_tab(self):
+        # после первой отрисовки достраиваем оставшиеся вкладки по одной, возвращая управление циклу Tk
+        if self._tab_builders:
+            self._build_tab(next(iter(self._tab_builders)))
+            self.root.after(10, self._prebuild_next_tab)
+
+    def _on_tab_changed(self, event=None):
+        self._lazy_build()
 
     # ============================================
     # UI FUNCTIONS
@@ -485,9 +1056,8 @@ class TelegramSenderApp:
         self.rate_delay_entry = field("Задержка (сек):", 3)
 
         # Подсказка
-        tk.Label(card, text="💡 Получите API ключи на my.telegram.org/apps",
-                 bg=self.colors['card'], fg=self.colors['text_muted'],
-                 font=('Segoe UI', 9, 'italic')).grid(row=4, column=0, columnspan=2, pady=(8, 12), sticky='nsew')
+        self.mk_hint(card, "💡 Получите API ключи на my.telegram.org/apps").grid(
+            row=4, column=0, columnspan=2, pady=(8, 12), sticky='nsew')
 
         # Кнопка сохранения
         self.create_button(card, "💾  Сохранить настройки", self.save_settings,
@@ -495,7 +1065,7 @@ class TelegramSenderApp:
 
         # Строка статуса
         self.settings_status = tk.Label(card, text="", bg=self.colors['card'], fg=self.colors['success'],
-                                        font=('Segoe UI', 10))
+                                        font=self._fonts['body'])
         self.settings_status.grid(row=6, column=0, columnspan=2, pady=(6, 10), sticky='nsew')
 
     # -- Manage Page: UI --
@@ -533,6 +1103,22 @@ class TelegramSenderApp:
         return card
 
     # Manage: UI component for groups
+    def _build_form(self, form, kind, fields):
+        """Строит поля формы (подпись, ключ) и регистрирует их в self._entries[kind]."""
+        entries = self._entries.setdefault(kind, {})
+        for i, (text, key) in enumerate(fields):
+            self.mk_label(form, text, bold=True).grid(row=i, column=0, sticky='w', pady=6, padx=(0, 10))
+            entry = self.mk_entry(form)
+            entry.grid(row=i, column=1, sticky='ew', pady=6)
+            entries[key] = entry
+
+    def _read_form(self, kind):
+        return {key: entry.get().strip() for key, entry in self._entries[kind].items()}
+
+    def _clear_form(self, kind):
+        for entry in self._entries[kind].values():
+            entry.delete(0, tk.END)
+
     def create_groups_manager(self, parent):
         card = self.create_card(parent, "📁  Управление группами")
         card.rowconfigure(0, weight=1)
@@ -546,13 +1132,7 @@ class TelegramSenderApp:
         form.grid(row=1, column=0, sticky='ew', pady=12)
         form.columnconfigure(1, weight=1)
 
-        fields = [("ID:", "group_id_entry"), ("Название TG:", "group_name_entry"),
-                  ("Номер клиента:", "group_client_entry")]
-        for i, (text, name) in enumerate(fields):
-            self.mk_label(form, text, bold=True).grid(row=i, column=0, sticky='w', pady=6, padx=(0, 10))
-            entry = self.mk_entry(form)
-            entry.grid(row=i, column=1, sticky='ew', pady=6)
-            setattr(self, name, entry)
+        self._build_form(form, 'group', [("ID:", "id"), ("Название TG:", "name"), ("Номер клиента:", "client")])
 
         btns = tk.Frame(card, bg=self.colors['card'])
         btns.grid(row=2, column=0, sticky='ew', pady=12)
@@ -581,13 +1161,8 @@ class TelegramSenderApp:
         form.grid(row=1, column=0, sticky='ew', pady=12)
         form.columnconfigure(1, weight=1)
 
-        fields = [("ID группы:", "theme_group_id_entry"), ("ID темы:", "theme_topic_id_entry"),
-                  ("Название:", "theme_name_entry"), ("Номер клиента:", "theme_client_entry")]
-        for i, (text, name) in enumerate(fields):
-            self.mk_label(form, text, bold=True).grid(row=i, column=0, sticky='w', pady=6, padx=(0, 10))
-            entry = self.mk_entry(form)
-            entry.grid(row=i, column=1, sticky='ew', pady=6)
-            setattr(self, name, entry)
+        self._build_form(form, 'theme', [("ID группы:", "group_id"), ("ID темы:", "topic_id"),
+                                         ("Название:", "name"), ("Номер клиента:", "client")])
 
         btns = tk.Frame(card, bg=self.colors['card'])
         btns.grid(row=2, column=0, sticky='ew', pady=12)
@@ -627,8 +1202,7 @@ class TelegramSenderApp:
         groups_card.columnconfigure(0, weight=1)
         groups_card.rowconfigure(2, weight=1)
 
-        tk.Label(groups_card, text="Загрузите список ваших Telegram групп и каналов",
-                 bg=self.colors['card'], fg=self.colors['text_muted'], font=('Segoe UI', 9, 'italic')).grid(
+        self.mk_hint(groups_card, "Загрузите список ваших Telegram групп и каналов").grid(
             row=0, column=0, pady=(0, 15), sticky='nsew')
         self.fetch_btn = self.create_button(groups_card, "🔄  Загрузить мои группы", self.fetch_user_groups,
                                             variant='primary')
@@ -638,8 +1212,7 @@ class TelegramSenderApp:
         self.fetched_groups_listbox.config(selectmode='extended')
         list_frame_g.grid(row=2, column=0, sticky='nsew')
 
-        tk.Label(groups_card, text="💡 Выберите несколько групп (Shift/Ctrl)",
-                 bg=self.colors['card'], fg=self.colors['text_muted'], font=('Segoe UI', 9)).grid(
+        self.mk_hint(groups_card, "💡 Выберите несколько групп (Shift/Ctrl)", small=True).grid(
             row=3, column=0, pady=(5, 15), sticky='nsew')
         self.create_button(groups_card, "➕  Добавить выбранные", self.add_fetched_groups,
                            variant='success').grid(row=4, column=0, pady=15, sticky='nsew')
@@ -650,8 +1223,7 @@ class TelegramSenderApp:
         topics_card.columnconfigure(0, weight=1)
         topics_card.rowconfigure(2, weight=1)
 
-        tk.Label(topics_card, text="Найдите доступные темы во всех группах-форумах",
-                 bg=self.colors['card'], fg=self.colors['text_muted'], font=('Segoe UI', 9, 'italic')).grid(
+        self.mk_hint(topics_card, "Найдите доступные темы во всех группах-форумах").grid(
             row=0, column=0, pady=(0, 15), sticky='nsew')
         self.fetch_topics_btn = self.create_button(topics_card, "🔍  Найти темы", self.fetch_all_group_topics,
                                                    variant='primary')
@@ -661,8 +1233,7 @@ class TelegramSenderApp:
         self.fetched_topics_listbox.config(selectmode='extended')
         list_frame_t.grid(row=2, column=0, sticky='nsew')
 
-        tk.Label(topics_card, text="💡 Выберите темы для добавления",
-                 bg=self.colors['card'], fg=self.colors['text_muted'], font=('Segoe UI', 9)).grid(
+        self.mk_hint(topics_card, "💡 Выберите темы для добавления", small=True).grid(
             row=3, column=0, pady=(5, 15), sticky='nsew')
         self.create_button(topics_card, "➕  Добавить выбранные темы", self.add_fetched_topics,
                            variant='success').grid(row=4, column=0, pady=15, sticky='nsew')
@@ -724,9 +1295,7 @@ class TelegramSenderApp:
 
         char_counter_frame = tk.Frame(msg_card, bg=self.colors['card'])
         char_counter_frame.grid(row=0, column=0, sticky='ew', pady=(0, 5))
-        self.char_counter = tk.Label(char_counter_frame, text="Символов: 0",
-                                     bg=self.colors['card'], fg=self.colors['text_muted'],
-                                     font=('Segoe UI', 9))
+        self.char_counter = self.mk_hint(char_counter_frame, "Символов: 0", small=True)
         self.char_counter.grid(row=0, column=0, sticky='e')
 
         self.var_buttons_frame = tk.Frame(msg_card, bg=self.colors['card'])
@@ -762,6 +1331,7 @@ class TelegramSenderApp:
         list_frame.grid(row=1, column=0, sticky='nsew')
         self.attachments_listbox.config(selectmode='extended')
         self.attachments = []
+        self._attachments_set = set()
 
         # --- Кнопка отправки ---
         self.send_btn = self.create_button(right_frame, "📨  Отправить сообщения", self.prepare_send,
@@ -775,11 +1345,24 @@ class TelegramSenderApp:
         progress_card.rowconfigure(0, weight=1)
 
         log_frame, self.log_text = self.mk_text(progress_card)
-        self.log_text.config(state='disabled', font=('Consolas', 9))
+        self.log_text.config(state='disabled', font=self._fonts['mono'])
         log_frame.grid(row=0, column=0, sticky='nsew')
 
     def update_char_counter(self, event=None):
-        count = len(self.message_text.get("1.0", tk.END).strip())
+        # при быстром наборе пересчитываем не чаще раза в 50 мс
+        if self._counter_after:
+            self.root.after_cancel(self._counter_after)
+        self._counter_after = self.root.after(50, self._do_update_counter)
+
+    def _do_update_counter(self):
+        self._counter_after = None
+        txt = self.message_text
+        # длина текста без крайних пробелов считается в Tk, без копирования буфера в Python
+        count = 0
+        if first := txt.search(r'\S', '1.0', tk.END, regexp=True):
+            last = txt.search(r'\S', tk.END, '1.0', backwards=True, regexp=True)
+            res = txt.count(first, f'{last}+1c', 'chars')
+            count = res[0] if isinstance(res, tuple) else (res or 0)
         self.char_counter.config(text=f"Символов: {count}")
 
     def insert_message_var(self, var):
@@ -789,43 +1372,92 @@ class TelegramSenderApp:
 
     # Sending: Builds the parameters section UI
     def build_params_section(self, parent):
-        for w in parent.winfo_children():
-            if w.winfo_class() != 'Labelframe': w.destroy()
+        # контейнер и кнопка создаются один раз; строки переиспользуются, меняются только их переменные
+        if getattr(self, '_param_rows_frame', None) is None:
+            self._param_rows_frame = tk.Frame(parent, bg=self.colors['card'])
+            self._param_rows_frame.grid(row=0, column=0, sticky='ew')
+            parent.columnconfigure(0, weight=1)
+            self._param_rows = []
 
-        rows_frame = tk.Frame(parent, bg=self.colors['card'])
-        rows_frame.grid(row=0, column=0, sticky='ew')
-        parent.columnconfigure(0, weight=1)
+            add_btn = self.create_button(parent, "➕ Добавить параметр", self.add_parameter, variant='secondary')
+            add_btn.grid(row=1, column=0, pady=8, padx=4, sticky='w')
+        self._update_params()
 
-        for idx, param in enumerate(self.parameters):
-            row = tk.Frame(rows_frame, bg=self.colors['card'])
-            row.grid(row=idx, column=0, sticky='ew', pady=4, padx=4)
-            row.columnconfigure(1, weight=1)
+    def _make_param_row(self, idx):
+        row = tk.Frame(self._param_rows_frame, bg=self.colors['card'])
+        row.columnconfigure(1, weight=1)
 
-            name_entry = self.mk_entry(row, textvariable=param['name_var'])
-            name_entry.grid(row=0, column=0, padx=(0, 4))
+        name_entry = self.mk_entry(row)
+        name_entry.grid(row=0, column=0, padx=(0, 4))
 
-            value_entry = self.mk_entry(row, textvariable=param['value_var'])
-            value_entry.grid(row=0, column=1, padx=(0, 4), sticky='ew')
+        value_entry = self.mk_entry(row)
+        value_entry.grid(row=0, column=1, padx=(0, 4), sticky='ew')
 
-            placeholder_button = self.create_button(row, f"[{param['name_var'].get()}]",
-                                                    lambda p=param: self.insert_message_var(f"[{p['name_var'].get()}]"),
-                                                    variant='secondary')
-            placeholder_button.grid(row=0, column=2, padx=(0, 4))
+        placeholder_button = self.create_button(
+            row, "", lambda i=idx: self.insert_message_var(f"[{self.parameters[i]['name_var'].get()}]"),
+            variant='secondary')
+        placeholder_button.grid(row=0, column=2, padx=(0, 4))
 
-            if len(self.parameters) > 1:
-                remove_btn = self.create_button(row, "✖", lambda i=idx: self.remove_parameter(i), variant='danger')
-                remove_btn.grid(row=0, column=3)
+        remove_btn = self.create_button(row, "✖", lambda i=idx: self.remove_parameter(i), variant='danger')
+        remove_btn.grid(row=0, column=3)
 
-            def on_name_change(*_args, var=param['name_var'], btn=placeholder_button):
-                new_text = f"[{var.get()}]"
-                btn.config(text=new_text)
-                btn.configure(command=lambda v=var: self.insert_message_var(f"[{v.get()}]"))
-                self.refresh_var_buttons()
+        return {'frame': row, 'name': name_entry, 'value': value_entry, 'button': placeholder_button,
+                'remove': remove_btn, 'param': None, 'traces': ()}
 
-            param['name_var'].trace_add('write', on_name_change)
+    def _bind_param_row(self, row, param):
+        if row['param'] is param:
+            return
+        if row['param'] is not None:
+            name_trace, value_trace = row['traces']
+            row['param']['name_var'].trace_remove('write', name_trace)
+            row['param']['value_var'].trace_remove('write', value_trace)
+        row['param'], row['traces'] = param, ()
+        if param is None:
+            return
+        row['name'].configure(textvariable=param['name_var'])
+        row['value'].configure(textvariable=param['value_var'])
+        row['button'].configure(text=f"[{param['name_var'].get()}]")
+        row['traces'] = (
+            param['name_var'].trace_add('write', lambda *_args, r=row: self._on_param_name_change(r)),
+            param['value_var'].trace_add('write', self._invalidate_vars_cache),
+        )
 
-        add_btn = self.create_button(parent, "➕ Добавить параметр", self.add_parameter, variant='secondary')
-        add_btn.grid(row=1, column=0, pady=8, padx=4, sticky='w')
+    def _on_param_name_change(self, row):
+        self._vars_cache = None
+        text = f"[{row['param']['name_var'].get()}]"
+        row['button'].configure(text=text)
+        # при наборе имени меняется только подпись соответствующей кнопки над сообщением
+        idx = self._param_rows.index(row)
+        if idx < len(self._var_buttons):
+            self._var_buttons[idx].configure(text=text)
+        else:
+            self.refresh_var_buttons()
+
+    def _invalidate_vars_cache(self, *_args):
+        self._vars_cache = None
+
+    def _update_params(self, start=0):
+        """Приводит строки к self.parameters начиная с индекса start; строки до него не трогаются."""
+        while len(self._param_rows) < len(self.parameters):
+            self._param_rows.append(self._make_param_row(len(self._param_rows)))
+
+        removable = len(self.parameters) > 1
+        if removable != getattr(self, '_params_removable', None):
+            # кнопки удаления появляются/исчезают во всех строках сразу
+            self._params_removable, start = removable, 0
+        for idx in range(start, len(self._param_rows)):
+            row = self._param_rows[idx]
+            if idx >= len(self.parameters):
+                self._bind_param_row(row, None)
+                row['frame'].grid_remove()
+                continue
+            self._bind_param_row(row, self.parameters[idx])
+            row['frame'].grid(row=idx, column=0, sticky='ew', pady=4, padx=4)
+            if removable:
+                row['remove'].grid()
+            else:
+                row['remove'].grid_remove()
+        self._vars_cache = None
         self.refresh_var_buttons()
 
     def add_parameter(self):
@@ -834,42 +1466,74 @@ class TelegramSenderApp:
         while name in existing:
             name = f"{name}_"
         self.parameters.append({'name_var': tk.StringVar(value=name), 'value_var': tk.StringVar()})
-        self.build_params_section(self.param_frame)
+        self._update_params(start=len(self.parameters) - 1)
 
     def remove_parameter(self, index):
         if 0 <= index < len(self.parameters):
             del self.parameters[index]
-            self.build_params_section(self.param_frame)
+            # строки выше удалённой остаются как есть, ниже — сдвигаются на одну
+            self._update_params(start=index)
 
     def refresh_var_buttons(self):
-        for widget in self.var_buttons_frame.winfo_children():
-            widget.destroy()
+        # серия изменений подряд (например, загрузка шаблона) даёт одну перестройку
+        if self._var_buttons_after:
+            self.root.after_cancel(self._var_buttons_after)
+        self._var_buttons_after = self.root.after(150, self._do_refresh_var_buttons)
+
+    def _do_refresh_var_buttons(self):
+        self._var_buttons_after = None
+        buttons = self._var_buttons
+        while len(buttons) > len(self.parameters):
+            buttons.pop().destroy()
         for i, param in enumerate(self.parameters):
-            name = param['name_var'].get()
-            placeholder = f"[{name}]"
-            btn = self.create_button(self.var_buttons_frame, placeholder,
-                                     lambda p=placeholder: self.insert_message_var(p), variant='secondary')
+            text = f"[{param['name_var'].get()}]"
+            if i < len(buttons):
+                buttons[i].configure(text=text)
+                continue
+            btn = self.create_button(self.var_buttons_frame, text,
+                                     lambda i=i: self.insert_message_var(f"[{self.parameters[i]['name_var'].get()}]"),
+                                     variant='secondary')
             btn.grid(row=0, column=i, padx=4)
+            buttons.append(btn)
 
     def replace_vars(self, text: str) -> str:
-        for param in self.parameters:
-            name = param['name_var'].get()
-            value = param['value_var'].get()
-            text = text.replace(f"[{name}]", value)
-        return text
+        # значения параметров читаются из Tk один раз после изменения, а не на каждого получателя
+        if self._vars_cache is None:
+            self._vars_cache = {}
+            for p in self.parameters:
+                # при совпадающих именах, как и раньше, подставляется значение первого параметра
+                self._vars_cache.setdefault(f"[{p['name_var'].get()}]", p['value_var'].get())
+            # все подстановки выполняются за один проход по тексту
+            self._vars_pattern = re.compile('|'.join(map(re.escape, self._vars_cache))) if self._vars_cache else None
+            self._rendered = {}
+        if self._vars_pattern is None:
+            return text
+        # получатели с одним шаблоном дают один и тот же текст: подстановка выполняется один раз
+        rendered = self._rendered.get(text)
+        if rendered is None:
+            if len(self._rendered) >= self.RENDERED_MAX:
+                self._rendered.clear()
+            cache = self._vars_cache
+            rendered = self._rendered[text] = self._vars_pattern.sub(lambda m: cache[m.group(0)], text)
+        return rendered
 
     def add_attachments(self):
+        from tkinter import filedialog
+
         paths = filedialog.askopenfilenames(title="Выберите файлы для прикрепления")
         if not paths: return
+        known, new = self._attachments_set, []
         for p in paths:
-            if p and p not in self.attachments:
-                self.attachments.append(p)
-                self.attachments_listbox.insert(tk.END, os.path.basename(p))
+            if p and p not in known:
+                known.add(p)
+                new.append(p)
+        self.attachments.extend(new)
+        self._fill_listbox(self.attachments_listbox, [os.path.basename(p) for p in new], append=True)
 
     def remove_attachments(self):
         for idx in sorted(self.attachments_listbox.curselection(), reverse=True):
             self.attachments_listbox.delete(idx)
-            self.attachments.pop(idx)
+            self._attachments_set.discard(self.attachments.pop(idx))
 
     # Sending: UI component for managing templates
     def create_templates_manager(self, parent):
@@ -889,6 +1553,7 @@ class TelegramSenderApp:
 
     # Sending: Builds the tag filter and group/theme selection UI
     def build_sending_lists(self, parent):
+        self._changed(str(parent), self._sending_snapshot())
         for w in parent.winfo_children(): w.destroy()
         parent.grid_rowconfigure(1, weight=0)
         parent.columnconfigure(0, weight=1)
@@ -896,26 +1561,36 @@ class TelegramSenderApp:
         tags_card = self.create_card(parent, "🏷️  Фильтр по тегам")
         tags_card.grid(row=0, column=0, sticky='ew', pady=(0, 12))
         tags_card.columnconfigure(0, weight=1)
-        tags_outer = tk.Frame(tags_card, bg=self.colors['tag_filter_bg'], relief='flat')
+        colors = self.colors
+        tag_bg, bg, primary = colors['tag_filter_bg'], colors['bg'], colors['primary']
+        tags_outer = tk.Frame(tags_card, bg=tag_bg, relief='flat')
         tags_outer.grid(row=0, column=0, sticky='ew', pady=8, padx=0)
         tags_outer.columnconfigure(0, weight=1)
-        tags_frame = tk.Frame(tags_outer, bg=self.colors['tag_filter_bg'])
+        tags_frame = tk.Frame(tags_outer, bg=tag_bg)
         tags_frame.grid(row=0, column=0, sticky='w', padx=12, pady=12)
 
         self.tag_filter_vars = []
         self.all_tags_var = tk.BooleanVar(value=True)
 
         def toggle_all_tags():
-            for var, _ in self.tag_filter_vars: var.set(self.all_tags_var.get())
-            self.filter_sending_lists()
+            # массовая установка: фильтр пересчитывается один раз в конце
+            self._filter_muted = True
+            try:
+                state = self.all_tags_var.get()
+                for var, _ in self.tag_filter_vars:
+                    if var.get() != state: var.set(state)
+            finally:
+                self._filter_muted = False
+            self._schedule_filter()
 
         def update_all_tags_state():
-            self.all_tags_var.set(all(var.get() for var, _ in self.tag_filter_vars))
-            self.filter_sending_lists()
+            if self._filter_muted: return
+            state = all(var.get() for var, _ in self.tag_filter_vars)
+            if self.all_tags_var.get() != state: self.all_tags_var.set(state)
+            self._schedule_filter()
 
         all_cb = self.mk_checkbutton(tags_frame, "Все", self.all_tags_var)
-        all_cb.config(command=toggle_all_tags, font=('Segoe UI', 10, 'bold'), fg=self.colors['primary'],
-                      activeforeground=self.colors['primary'])
+        all_cb.config(command=toggle_all_tags, font=self._fonts['bold'], fg=primary, activeforeground=primary)
         all_cb.grid(row=0, column=0, padx=8)
 
         for i, tag in enumerate(self.app_data["tags"]):
@@ -925,7 +1600,7 @@ class TelegramSenderApp:
             cb.config(command=update_all_tags_state)
             cb.grid(row=0, column=i + 1, padx=8)
 
-        lists_container = tk.Frame(parent, bg=self.colors['bg'])
+        lists_container = tk.Frame(parent, bg=bg)
         lists_container.grid(row=1, column=0, sticky='nsew', pady=(0, 12))
         lists_container.grid_columnconfigure((0, 1), weight=1)
         lists_container.grid_rowconfigure(0, weight=0)
@@ -935,7 +1610,7 @@ class TelegramSenderApp:
         self.groups_card_sending.grid(row=0, column=0, sticky='nsew', padx=(0, 8))
         self.themes_card_sending.grid(row=0, column=1, sticky='nsew', padx=(8, 0))
 
-        btn_select = tk.Frame(parent, bg=self.colors['bg'])
+        btn_select = tk.Frame(parent, bg=bg)
         btn_select.grid(row=2, column=0, sticky='ew', pady=12)
         btn_select.columnconfigure((0, 1), weight=1)
         self.create_button(btn_select, "✓  Выбрать все", self.select_all, variant='primary').grid(row=0, column=0,
@@ -945,64 +1620,200 @@ class TelegramSenderApp:
                                                                                                       sticky='ew',
                                                                                                       padx=(5, 0))
 
-        self.filter_sending_lists()
+        self._build_recipient_rows()
+        self.filter_sending_lists(force=True)
 
-    def filter_sending_lists(self):
-        active_tags = {tag for var, tag in getattr(self, 'tag_filter_vars', []) if var.get()}
+    def _build_recipient_rows(self):
+        # один список с множественным выбором на вид получателей; фильтр по тегам только перезаполняет его
+        self._recipient_rows = {}
+        for kind, card, items in (('group', self.groups_card_sending, self.app_data["groups"]),
+                                  ('theme', self.themes_card_sending, self.app_data["themes"])):
+            card.grid_rowconfigure(0, weight=1)
+            card.grid_columnconfigure(0, weight=1)
+            list_frame, listbox = self.mk_listbox(card)
+            listbox.config(selectmode=tk.MULTIPLE)
+            list_frame.grid(row=0, column=0, sticky='nsew')
 
-        def populate(card, items, is_group):
-            for widget in card.winfo_children():
-                widget.destroy()
+            empty = self.mk_label(card, "Нет элементов", color=self.colors['text_muted'])
+            empty.grid(row=0, column=0, pady=20, padx=20)
+            empty.grid_remove()
+            # rows — ключ адресата -> (порядковый номер, элемент) для всех элементов вида,
+            # visible — показанные сейчас (по строкам списка), selected — ключи выбранных, в том числе скрытых фильтром
+            rows = {}
+            for item in items:
+                rows.setdefault(self._recipient_key(item), (next(self._row_seq), item))
+            self._recipient_rows[kind] = {'rows': rows, 'visible': [], 'selected': set(), 'listbox': listbox,
+                                          'frame': list_frame, 'empty': empty}
+
+    @staticmethod
+    def _recipient_key(item):
+        # ключ по адресату, а не id() объекта: адрес удаленного элемента может достаться новому
+        return item['id'] if 'id' in item else (item['group_id'], item.get('topic_id'))
+
+    def _append_sending_rows(self, items, is_group):
+        """Добавляет на вкладку отправки новые строки вместо перестройки всех списков."""
+        if not hasattr(self, '_recipient_rows'):
+            return
+        rows = self._recipient_rows['group' if is_group else 'theme']['rows']
+        for item in items:
+            # номер только растет, поэтому удаление строк не сбивает порядок остальных
+            rows.setdefault(self._recipient_key(item), (next(self._row_seq), item))
+        self._sending_rows_synced()
+
+    def _remove_sending_row(self, item, is_group):
+        if not hasattr(self, '_recipient_rows'):
+            return
+        state = self._recipient_rows['group' if is_group else 'theme']
+        # выбор переносим в модель до изменения строк, иначе фильтр вернет ключ удаленной строки в selected
+        self._sync_recipient_selection(state)
+        state['visible'] = []
+        key = self._recipient_key(item)
+        row = state['rows'].get(key)
+        if row is None or row[1] is not item:
+            return self._sending_rows_synced()
+        # у адресата может остаться дубликат в данных — тогда строка остается за ним
+        same = next((x for x in self.app_data["groups" if is_group else "themes"]
+                     if x is not item and self._recipient_key(x) == key), None)
+        if same is None:
+            del state['rows'][key]
+            state['selected'].discard(key)
+        else:
+            state['rows'][key] = (row[0], same)
+        self._sending_rows_synced()
 
-            card.grid_rowconfigure(0, weight=0)
-            card.grid_columnconfigure(0, weight=1)
-            container, scrollable_area = self._create_scrollable_area(card)
-            container.grid(row=0, column=0, sticky='nsew')
-
-            item_vars = []
-            for i, item in enumerate(items):
-                if not active_tags or set(item.get('tags', [])).intersection(active_tags):
-                    var = tk.BooleanVar()
-                    item_vars.append((var, item))
-                    label = f"{item['name']} - Клиент: {item.get('client_number', 'N/A')}"
-                    cb = self.mk_checkbutton(scrollable_area, label, var)
-                    cb.grid(row=i, column=0, sticky='w', pady=2, padx=8)
-
-            if not item_vars:
-                self.mk_label(scrollable_area, "Нет элементов", color=self.colors['text_muted']).grid(row=0, column=0,
-                                                                                                      pady=20, padx=20)
-
-            if is_group:
-                self.group_vars = item_vars
+    def _sending_rows_synced(self):
+        # строки уже соответствуют данным: refresh_all_lists не должен перестраивать раздел целиком
+        self._changed(str(self.lists_card_sending), self._sending_snapshot())
+        self.filter_sending_lists(force=True)
+
+    def _schedule_filter(self):
+        # серия переключений тегов до простоя цикла Tk дает один проход фильтра
+        if self._filter_after is None:
+            self._filter_after = self.root.after_idle(self._run_scheduled_filter)
+
+    def _run_scheduled_filter(self):
+        self._filter_after = None
+        self.filter_sending_lists()
+
+    def filter_sending_lists(self, force=False):
+        # force — набор строк изменился, и прошлый результат фильтра устарел
+        active_tags = frozenset(tag for var, tag in getattr(self, 'tag_filter_vars', []) if var.get())
+        if not force and active_tags == self._last_active_tags: return
+        self._last_active_tags = active_tags
+        self._filter_sending_lists(active_tags)
+
+    def _sync_recipient_selection(self, state):
+        # выбор показанных строк переносим в модель: скрытые фильтром сохраняют свой выбор
+        selected = state['selected']
+        picked = set(state['listbox'].curselection())
+        for i, item in enumerate(state['visible']):
+            if i in picked:
+                selected.add(self._recipient_key(item))
             else:
-                self.theme_vars = item_vars
-
-        populate(self.groups_card_sending, self.app_data["groups"], True)
-        populate(self.themes_card_sending, self.app_data["themes"], False)
-
-    def refresh_all_lists(self):
-        for listbox, items, formatter in [
-            (self.tags_listbox, self.app_data["tags"], lambda t: t),
-            (self.groups_listbox, self.app_data["groups"], lambda g: f"{g['name']} | ID: {g['id']}"),
-            (self.themes_listbox, self.app_data["themes"], lambda t: f"{t['name']} | Группа: {t['group_id']}"),
-            (self.templates_listbox, self.app_data["templates"], lambda t: t["name"])
-        ]:
-            listbox.delete(0, tk.END)
-            for item in items:
-                listbox.insert(tk.END, formatter(item))
+                selected.discard(self._recipient_key(item))
+
+    def _filter_sending_lists(self, active_tags):
+        for state in self._recipient_rows.values():
+            listbox, selected = state['listbox'], state['selected']
+            self._sync_recipient_selection(state)
+
+            rows = state['rows']
+            if active_tags:
+                # обратный индекс тег -> элементы: обходим только подходящие элементы, а не все строки;
+                # ключи групп и тем не пересекаются (число против пары)
+                matched = {self._recipient_key(item) for tag in active_tags for item in self._tag_to_items.get(tag, ())}
+                visible = [item for _, item in sorted((rows[key] for key in matched if key in rows),
+                                                      key=lambda row: row[0])]
+            else:
+                visible = [item for _, item in rows.values()]
+            state['visible'] = visible
+            self._fill_listbox(listbox, [f"{item['name']} - Клиент: {item.get('client_number', 'N/A')}"
+                                         for item in visible])
+            for i, item in enumerate(visible):
+                if self._recipient_key(item) in selected:
+                    listbox.selection_set(i)
+
+            if visible:
+                state['empty'].grid_remove()
+                state['frame'].grid()
+            else:
+                state['frame'].grid_remove()
+                state['empty'].grid()
+
+    def _selected_recipients(self, kind):
+        """Выбранные элементы вида среди показанных фильтром — к отправке попадают только они."""
+        state = getattr(self, '_recipient_rows', {}).get(kind)
+        if state is None:
+            return []
+        visible = state['visible']
+        return [visible[i] for i in state['listbox'].curselection()]
+
+    # вид данных -> (атрибут списка, формат строки)
+    LIST_KINDS = {
+        'tags': ('tags_listbox', lambda t: t),
+        'groups': ('groups_listbox', lambda g: f"{g['name']} | ID: {g['id']}"),
+        'themes': ('themes_listbox', lambda t: f"{t['name']} | Группа: {t['group_id']}"),
+        'templates': ('templates_listbox', lambda t: t["name"]),
+    }
+
+    def _refresh_listboxes(self, kinds=tuple(LIST_KINDS)):
+        # списки на ещё не построенных вкладках пропускаем: заполнятся при их создании
+        for kind in kinds:
+            name, formatter = self.LIST_KINDS[kind]
+            if (listbox := getattr(self, name, None)) is None:
+                continue
+            lines = [formatter(item) for item in self.app_data[kind]]
+            # ключ — путь виджета: новый список (например, на только что построенной вкладке) всегда заполняется
+            if self._shown_lines.get(str(listbox)) != lines:
+                self._fill_listbox(listbox, lines)
+                self._shown_lines[str(listbox)] = lines
+
+    def _list_append(self, kind, items):
+        """Дописывает в список вида только новые строки, без перечитывания всех данных."""
+        name, formatter = self.LIST_KINDS[kind]
+        if (listbox := getattr(self, name, None)) is None or (shown := self._shown_lines.get(str(listbox))) is None:
+            return
+        lines = [formatter(item) for item in items]
+        shown.extend(lines)
+        self._fill_listbox(listbox, lines, append=True)
+
+    def _list_delete(self, kind, index):
+        """Убирает из списка вида одну строку — ту, что только что удалена из данных по тому же индексу."""
+        name, _ = self.LIST_KINDS[kind]
+        if (listbox := getattr(self, name, None)) is None or (shown := self._shown_lines.get(str(listbox))) is None:
+            return
+        del shown[index]
+        listbox.delete(index)
+
+    def _changed(self, key, content):
+        """True, если content отличается от того, что было показано под этим ключом в прошлый раз."""
+        h = hash(content)
+        if self._data_hashes.get(key) == h:
+            return False
+        self._data_hashes[key] = h
+        return True
+
+    def refresh_all_lists(self, kinds=tuple(LIST_KINDS)):
+        """Обновляет списки для изменившихся видов данных (по умолчанию — все)."""
+        self._refresh_listboxes(kinds)
+
+        # если уже создан раздел с получателями и теги/группы/темы изменились, перестраиваем его
+        if hasattr(self, 'lists_card_sending') and not {'tags', 'groups', 'themes'}.isdisjoint(kinds):
+            if self._changed(str(self.lists_card_sending), self._sending_snapshot()):
+                self.build_sending_lists(self.lists_card_sending)
 
-        # если уже создан раздел с получателями, обновляем его
-        if hasattr(self, 'lists_card_sending'):
-            self.build_sending_lists(self.lists_card_sending)
+    def _sending_snapshot(self):
+        return repr([self.app_data[k] for k in ("tags", "groups", "themes")])
 
     # -- Manage Page Logic --
     def add_tag(self):
         tag_name = self.tag_name_entry.get().strip()
         if not tag_name: return messagebox.showwarning("Внимание", "Название тега не может быть пустым!")
-        if tag_name in self.app_data["tags"]: return messagebox.showwarning("Внимание", "Такой тег уже существует.")
+        if tag_name in self._tags_set: return messagebox.showwarning("Внимание", "Такой тег уже существует.")
         self.app_data["tags"].append(tag_name)
-        save_app_data(self.app_data)
-        self.refresh_all_lists()
+        self._tags_set.add(tag_name)
+        self._schedule_save()
+        self.refresh_all_lists(('tags',))
         self.tag_name_entry.delete(0, tk.END)
         messagebox.showinfo("Успех", "Тег добавлен!")
 
@@ -1013,30 +1824,122 @@ class TelegramSenderApp:
         if messagebox.askyesno("Подтверждение",
                                f"Удалить тег '{tag_to_delete}'? Он также будет удален из всех групп и тем."):
             del self.app_data["tags"][sel[0]]
-            for item in self.app_data["groups"] + self.app_data["themes"]:
-                if "tags" in item and tag_to_delete in item["tags"]:
-                    item["tags"].remove(tag_to_delete)
-            save_app_data(self.app_data)
-            self.refresh_all_lists()
+            self._tags_set.discard(tag_to_delete)
+            # обходим только элементы с этим тегом, а не все группы и темы
+            for item in self._tag_to_items.pop(tag_to_delete, ()):
+                item["tags"].remove(tag_to_delete)
+            self._schedule_save()
+            self.refresh_all_lists(('tags',))
             messagebox.showinfo("Успех", "Тег удален!")
 
+    def _reindex_tags(self):
+        """Обратный индекс: тег -> группы и темы, у которых он назначен."""
+        self._tag_to_items = {}
+        for item in itertools.chain(self.app_data["groups"], self.app_data["themes"]):
+            self._index_item_tags(item)
+
+    def _index_item_tags(self, item):
+        for tag in item.get("tags", ()):
+            self._tag_to_items.setdefault(tag, []).append(item)
+
+    def _unindex_item_tags(self, item):
+        for tag in item.get("tags", ()):
+            bucket = self._tag_to_items.get(tag, [])
+            for i, indexed in enumerate(bucket):
+                if indexed is item:
+                    del bucket[i]
+                    break
+
+    def _merge_tags(self, tags):
+        """
+        Добавляет в общий список тегов те, которых там ещё нет (проверка по множеству, а не по списку).
+        Возвращает True, если появились новые теги.
+        """
+        known = self._tags_set
+        added = False
+        for t in tags:
+            if t not in known:
+                self.app_data["tags"].append(t)
+                known.add(t)
+                added = True
+        return added
+
+    def _ask_tags(self, title):
+        """
+        Окно выбора тегов: существующие — множественным выбором в списке, новые — через запятую.
+        Возвращает список тегов без повторов или None, если окно закрыто без подтверждения.
+        """
+        result = {'value': None}
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Назначить теги")
+        dialog.configure(bg=self.colors['bg'])
+        dialog.transient(self.root)
+        dialog.grab_set()
+        width, height = 420, 460
+        self._center_window(dialog, width, height)
+        dialog.grid_columnconfigure(0, weight=1)
+
+        card = self.create_card(dialog, title)
+        card.grid(row=0, column=0, sticky='nsew', padx=20, pady=20)
+        card.columnconfigure(0, weight=1)
+        card.rowconfigure(1, weight=1)
+        dialog.grid_rowconfigure(0, weight=1)
+
+        all_tags = list(self.app_data["tags"])
+        self.mk_label(card, "Существующие теги:", bold=True).grid(row=0, column=0, sticky='w')
+        list_frame, tags_listbox = self.mk_listbox(card)
+        tags_listbox.config(selectmode=tk.MULTIPLE)
+        list_frame.grid(row=1, column=0, sticky='nsew', pady=(4, 12))
+        self._fill_listbox(tags_listbox, all_tags)
+
+        self.mk_label(card, "Новые теги через запятую:", bold=True).grid(row=2, column=0, sticky='w')
+        entry = self.mk_entry(card)
+        entry.grid(row=3, column=0, sticky='ew', pady=(4, 12))
+
+        btn_frame = tk.Frame(card, bg=self.colors['card'])
+        btn_frame.grid(row=4, column=0, sticky='ew', pady=(8, 4))
+        btn_frame.columnconfigure((0, 1), weight=1)
+
+        def on_ok():
+            tags = [all_tags[i] for i in tags_listbox.curselection()]
+            seen = set(tags)
+            for t in entry.get().split(','):
+                t = t.strip()
+                if t and t not in seen:
+                    tags.append(t)
+                    seen.add(t)
+            result['value'] = tags
+            dialog.destroy()
+
+        self.create_button(btn_frame, "Готово", on_ok, variant='success').grid(row=0, column=0, sticky='ew',
+                                                                               padx=(0, 4))
+        self.create_button(btn_frame, "Без тегов", dialog.destroy, variant='secondary').grid(row=0, column=1,
+                                                                                             sticky='ew', padx=(4, 0))
+
+        dialog.protocol("WM_DELETE_WINDOW", dialog.destroy)
+        self.root.wait_window(dialog)
+        return result['value']
+
     def add_group(self):
         try:
-            gid, name = int(self.group_id_entry.get()), self.group_name_entry.get().strip()
-            client_num = self.group_client_entry.get().strip()
+            form = self._read_form('group')
+            gid, name, client_num = int(form['id']), form['name'], form['client']
             if not name: return messagebox.showwarning("Внимание", "Укажите название группы!")
 
-            tag_input = simpledialog.askstring("Назначить теги", f"Введите теги для группы '{name}' через запятую:",
-                                               parent=self.root)
-            tags = [t.strip() for t in tag_input.split(',') if t.strip()] if tag_input else []
-            for t in tags:
-                if t not in self.app_data["tags"]: self.app_data["tags"].append(t)
-
-            self.app_data["groups"].append(
-                {"id": gid, "name": name, "client_number": client_num, "tags": tags, "custom_templates": {}})
-            save_app_data(self.app_data)
-            self.refresh_all_lists()
-            for e in [self.group_id_entry, self.group_name_entry, self.group_client_entry]: e.delete(0, tk.END)
+            tags = self._ask_tags(f"Теги для группы '{name}'") or []
+            new_tags = self._merge_tags(tags)
+
+            record = {"id": gid, "name": name, "client_number": client_num, "tags": tags, "custom_templates": {}}
+            self.app_data["groups"].append(record)
+            self._index_item_tags(record)
+            self._schedule_save()
+            # новый тег меняет панель фильтра — тогда раздел отправки перестраивается целиком
+            if new_tags:
+                self.refresh_all_lists(('tags', 'groups'))
+            else:
+                self._append_sending_rows([record], True)
+                self._list_append('groups', [record])
+            self._clear_form('group')
             messagebox.showinfo("Успех", "Группа добавлена!")
         except ValueError:
             messagebox.showerror("Ошибка", "ID группы должен быть числом!")
@@ -1045,30 +1948,34 @@ class TelegramSenderApp:
         sel = self.groups_listbox.curselection()
         if not sel: return messagebox.showwarning("Внимание", "Выберите группу для удаления!")
         if messagebox.askyesno("Подтверждение", "Удалить выбранную группу?"):
-            del self.app_data["groups"][sel[0]]
-            save_app_data(self.app_data)
-            self.refresh_all_lists()
+            removed = self.app_data["groups"].pop(sel[0])
+            self._unindex_item_tags(removed)
+            self._schedule_save()
+            self._remove_sending_row(removed, True)
+            self._list_delete('groups', sel[0])
             messagebox.showinfo("Успех", "Группа удалена!")
 
     def add_theme(self):
         try:
-            gid, tid = int(self.theme_group_id_entry.get()), int(self.theme_topic_id_entry.get())
-            name, client_num = self.theme_name_entry.get().strip(), self.theme_client_entry.get().strip()
+            form = self._read_form('theme')
+            gid, tid = int(form['group_id']), int(form['topic_id'])
+            name, client_num = form['name'], form['client']
             if not name: return messagebox.showwarning("Внимание", "Укажите название темы!")
 
-            tag_input = simpledialog.askstring("Назначить теги", f"Введите теги для темы '{name}' через запятую:",
-                                               parent=self.root)
-            tags = [t.strip() for t in tag_input.split(',') if t.strip()] if tag_input else []
-            for t in tags:
-                if t not in self.app_data["tags"]: self.app_data["tags"].append(t)
-
-            self.app_data["themes"].append(
-                {"group_id": gid, "topic_id": tid, "name": name, "client_number": client_num, "tags": tags,
-                 "custom_templates": {}})
-            save_app_data(self.app_data)
-            self.refresh_all_lists()
-            for e in [self.theme_group_id_entry, self.theme_topic_id_entry, self.theme_name_entry,
-                      self.theme_client_entry]: e.delete(0, tk.END)
+            tags = self._ask_tags(f"Теги для темы '{name}'") or []
+            new_tags = self._merge_tags(tags)
+
+            record = {"group_id": gid, "topic_id": tid, "name": name, "client_number": client_num, "tags": tags,
+                      "custom_templates": {}}
+            self.app_data["themes"].append(record)
+            self._index_item_tags(record)
+            self._schedule_save()
+            if new_tags:
+                self.refresh_all_lists(('tags', 'themes'))
+            else:
+                self._append_sending_rows([record], False)
+                self._list_append('themes', [record])
+            self._clear_form('theme')
             messagebox.showinfo("Успех", "Тема добавлена!")
         except ValueError:
             messagebox.showerror("Ошибка", "ID группы и темы должны быть числами!")
@@ -1077,9 +1984,11 @@ class TelegramSenderApp:
         sel = self.themes_listbox.curselection()
         if not sel: return messagebox.showwarning("Внимание", "Выберите тему для удаления!")
         if messagebox.askyesno("Подтверждение", "Удалить выбранную тему?"):
-            del self.app_data["themes"][sel[0]]
-            save_app_data(self.app_data)
-            self.refresh_all_lists()
+            removed = self.app_data["themes"].pop(sel[0])
+            self._unindex_item_tags(removed)
+            self._schedule_save()
+            self._remove_sending_row(removed, False)
+            self._list_delete('themes', sel[0])
             messagebox.showinfo("Успех", "Тема удалена!")
 
     def edit_item(self, item_type):
@@ -1096,13 +2005,12 @@ class TelegramSenderApp:
         dialog.transient(self.root);
         dialog.grab_set()
         width, height = 480, 600
-        x, y = (self.root.winfo_screenwidth() - width) // 2, (self.root.winfo_screenheight() - height) // 2
-        dialog.geometry(f"{width}x{height}+{x}+{y}")
+        self._center_window(dialog, width, height)
         dialog.grid_columnconfigure(0, weight=1)
         dialog.grid_rowconfigure(3, weight=1)
 
         tk.Label(dialog, text=f"Редактирование: {item['name']}", bg=self.colors['bg'],
-                 font=('Segoe UI', 12, 'bold')).grid(row=0, column=0, pady=(20, 10))
+                 font=self._fonts['heading']).grid(row=0, column=0, pady=(20, 10))
 
         form_frame = tk.Frame(dialog, bg=self.colors['card'], relief='solid', bd=1, highlightthickness=1)
         form_frame.grid(row=1, column=0, sticky='ew', padx=20, pady=(0, 10))
@@ -1118,26 +2026,30 @@ class TelegramSenderApp:
         name_entry = create_field(form_frame, "Название:", item['name'], 0)
         client_entry = create_field(form_frame, "Номер клиента:", item['client_number'], 1)
 
-        tk.Label(dialog, text="Теги:", bg=self.colors['bg'], font=('Segoe UI', 10, 'bold')).grid(row=2, column=0,
+        tk.Label(dialog, text="Теги:", bg=self.colors['bg'], font=self._fonts['bold']).grid(row=2, column=0,
                                                                                                  sticky='w', padx=20,
                                                                                                  pady=(10, 0))
 
-        container, tag_scrollable_area = self._create_scrollable_area(dialog)
-        container.grid(row=3, column=0, sticky='nsew', padx=20, pady=10)
-
-        vars_map, current_tags = {}, set(item.get('tags', []))
-        for i, tag in enumerate(self.app_data["tags"]):
-            var = tk.BooleanVar(value=(tag in current_tags))
-            vars_map[tag] = var
-            self.mk_checkbutton(tag_scrollable_area, tag, var).grid(row=i, column=0, sticky='w', padx=10, pady=5)
+        # один список с множественным выбором вместо чекбокса на каждый тег
+        all_tags = list(self.app_data["tags"])
+        list_frame, tags_listbox = self.mk_listbox(dialog)
+        tags_listbox.config(selectmode=tk.MULTIPLE)
+        list_frame.grid(row=3, column=0, sticky='nsew', padx=20, pady=10)
+        self._fill_listbox(tags_listbox, all_tags)
+        current_tags = set(item.get('tags', []))
+        for i, tag in enumerate(all_tags):
+            if tag in current_tags:
+                tags_listbox.selection_set(i)
 
         def save_changes():
             if not name_entry.get().strip(): return messagebox.showwarning("Внимание", "Название не может быть пустым!")
             item['name'] = name_entry.get().strip()
             item['client_number'] = client_entry.get().strip()
-            item['tags'] = [t for t, v in vars_map.items() if v.get()]
-            save_app_data(self.app_data)
-            self.refresh_all_lists()
+            self._unindex_item_tags(item)
+            item['tags'] = [all_tags[i] for i in tags_listbox.curselection()]
+            self._index_item_tags(item)
+            self._schedule_save()
+            self.refresh_all_lists((item_type + 's',))
             dialog.destroy()
 
         self.create_button(dialog, "Сохранить", save_changes, variant='success').grid(row=4, column=0, pady=20)
@@ -1160,13 +2072,12 @@ class TelegramSenderApp:
         dlg.transient(self.root);
         dlg.grab_set()
         width, height = 500, 550
-        x, y = (self.root.winfo_screenwidth() - width) // 2, (self.root.winfo_screenheight() - height) // 2
-        dlg.geometry(f"{width}x{height}+{x}+{y}")
+        self._center_window(dlg, width, height)
         dlg.grid_columnconfigure(0, weight=1)
         dlg.grid_rowconfigure(2, weight=1)
 
         tk.Label(dlg, text="Выберите шаблон и настройте текст", bg=self.colors['bg'],
-                 font=('Segoe UI', 12, 'bold')).grid(row=0, column=0, pady=(20, 10))
+                 font=self._fonts['heading']).grid(row=0, column=0, pady=(20, 10))
 
         combo_frame = tk.Frame(dlg, bg=self.colors['bg'])
         combo_frame.grid(row=1, column=0, sticky='ew', padx=20, pady=(0, 10))
@@ -1191,7 +2102,7 @@ class TelegramSenderApp:
 
         def load_template_text(event=None):
             name = template_var.get()
-            base_text = next((tpl.get("text", "") for tpl in self.app_data["templates"] if tpl["name"] == name), "")
+            base_text = self._templates_by_name.get(name, {}).get("text", "")
             override_text = item.get('custom_templates', {}).get(name, base_text)
             custom_text.delete('1.0', tk.END);
             custom_text.insert('1.0', override_text)
@@ -1203,7 +2114,7 @@ class TelegramSenderApp:
             name = template_var.get()
             text = custom_text.get('1.0', tk.END).rstrip()
             item.setdefault('custom_templates', {})[name] = text
-            save_app_data(self.app_data)
+            self._schedule_save()
             messagebox.showinfo("Успех", f"Шаблон '{name}' обновлен для {item_type_str} {item['name']}")
             dlg.destroy()
 
@@ -1235,13 +2146,16 @@ class TelegramSenderApp:
 
         param_names = [p['name_var'].get() for p in self.parameters if p['name_var'].get()]
 
-        if any(t["name"] == name for t in self.app_data["templates"]):
+        if (existing := self._templates_by_name.get(name)) is not None:
             if not messagebox.askyesno("Внимание", "Шаблон с таким именем уже существует. Перезаписать?"): return
-            self.app_data["templates"] = [t for t in self.app_data["templates"] if t["name"] != name]
-
-        self.app_data["templates"].append({"name": name, "text": text, "params": param_names})
-        save_app_data(self.app_data)
-        self.refresh_all_lists()
+            existing.update(text=text, params=param_names)
+        else:
+            tpl = {"name": name, "text": text, "params": param_names}
+            self.app_data["templates"].append(tpl)
+            self._templates_by_name[name] = tpl
+            # перезапись не меняет строку в списке, новое имя — одна строка в конце
+            self._list_append('templates', [tpl])
+        self._schedule_save()
         messagebox.showinfo("Успех", "Шаблон сохранен!")
 
     def delete_template(self):
@@ -1250,8 +2164,9 @@ class TelegramSenderApp:
         name = self.app_data["templates"][sel[0]]["name"]
         if messagebox.askyesno("Подтверждение", f"Удалить шаблон '{name}'?"):
             del self.app_data["templates"][sel[0]]
-            save_app_data(self.app_data)
-            self.refresh_all_lists()
+            self._templates_by_name.pop(name, None)
+            self._schedule_save()
+            self._list_delete('templates', sel[0])
             messagebox.showinfo("Успех", "Шаблон удален!")
 
     def get_input_from_dialog(self, title, prompt, show=None, timeout=120):
@@ -1274,24 +2189,38 @@ class TelegramSenderApp:
             return self.notebook.select(0)
         self.fetch_btn.state(['disabled']);
         self.fetch_btn.config(text="⏳ Загрузка...")
-        threading.Thread(target=self.fetch_in_thread, daemon=True,
-                         args=(lambda c: get_user_groups(c), self.update_fetched_groups_list_ui,
-                               self.fetch_btn, "🔄  Загрузить мои группы")).start()
-
-    def update_fetched_groups_list_ui(self, groups):
+        self.fetched_groups = []
         self.fetched_groups_listbox.delete(0, tk.END)
-        self.fetched_groups = groups
-        for g in groups: self.fetched_groups_listbox.insert(tk.END, f"{g['name']} | ID: {g['id']}")
-        messagebox.showinfo("Успех", f"Загружено {len(groups)} групп!")
+        cancel = self._fetch_cancel
+
+        async def _stream_groups(client):
+            # строки появляются в списке по мере загрузки, а не после получения всех диалогов
+            total = 0
+            async for chunk in iter_user_groups(client):
+                if cancel.is_set(): break
+                self.root.after(0, self._append_fetched_groups, chunk)
+                total += len(chunk)
+            return total
+
+        self.run_in_worker(lambda w: w.submit(_stream_groups), self.update_fetched_groups_list_ui,
+                           self.fetch_btn, "🔄  Загрузить мои группы")
+
+    def _append_fetched_groups(self, chunk):
+        self.fetched_groups.extend(chunk)
+        self._fill_listbox(self.fetched_groups_listbox, [f"{g['name']} | ID: {g['id']}" for g in chunk], append=True)
+
+    def update_fetched_groups_list_ui(self, total):
+        messagebox.showinfo("Успех", f"Загружено {total} групп!")
         self.notebook.select(2)
 
     def add_fetched_groups(self):
         sel = self.fetched_groups_listbox.curselection()
         if not sel: return messagebox.showwarning("Внимание", "Выберите группы для добавления!")
-        added = 0
+        added, new_tags = [], False
+        existing_ids = {x['id'] for x in self.app_data["groups"]}
         for idx in sel:
             g = self.fetched_groups[idx]
-            if any(x['id'] == g['id'] for x in self.app_data["groups"]): continue
+            if g['id'] in existing_ids: continue
 
             result = self._ask_new_group_info(g)
             if result is None: continue
@@ -1300,14 +2229,20 @@ class TelegramSenderApp:
             record = {"id": g['id'], "name": g['name'], "client_number": client_num, "tags": [], "custom_templates": {}}
             if selected_tag:
                 record["tags"] = [selected_tag]
-                if selected_tag not in self.app_data["tags"]: self.app_data["tags"].append(selected_tag)
+                new_tags |= self._merge_tags(record["tags"])
             self.app_data["groups"].append(record)
-            added += 1
+            self._index_item_tags(record)
+            existing_ids.add(g['id'])
+            added.append(record)
 
         if added:
-            save_app_data(self.app_data)
-            self.refresh_all_lists()
-            messagebox.showinfo("Успех", f"Добавлено {added} новых групп!")
+            self._schedule_save()
+            if new_tags:
+                self.refresh_all_lists(('tags', 'groups'))
+            else:
+                self._append_sending_rows(added, True)
+                self._list_append('groups', added)
+            messagebox.showinfo("Успех", f"Добавлено {len(added)} новых групп!")
         else:
             messagebox.showinfo("Информация", "Все выбранные группы уже есть в списке или добавление отменено.")
 
@@ -1319,8 +2254,7 @@ class TelegramSenderApp:
         dialog.transient(self.root);
         dialog.grab_set()
         width, height = 440, 300
-        x, y = (self.root.winfo_screenwidth() - width) // 2, (self.root.winfo_screenheight() - height) // 2
-        dialog.geometry(f"{width}x{height}+{x}+{y}")
+        self._center_window(dialog, width, height)
         dialog.grid_columnconfigure(0, weight=1)
 
         card = self.create_card(dialog, f"Добавление группы '{group['name']}'")
@@ -1362,64 +2296,96 @@ class TelegramSenderApp:
         if not self.fetched_groups: return messagebox.showwarning("Внимание", "Сначала загрузите список групп!")
         self.fetch_topics_btn.state(['disabled']);
         self.fetch_topics_btn.config(text="⏳  Поиск тем...")
-        threading.Thread(target=self.fetch_in_thread, daemon=True,
-                         args=(self._fetch_topics_for_groups_async, self.update_fetched_topics_list_ui_multi,
-                               self.fetch_topics_btn, "🔍  Найти темы")).start()
-
-    async def _fetch_topics_for_groups_async(self, client):
-        all_topics = []
-        for g in self.fetched_groups:
-            try:
-                topics, error = await get_group_topics(client, g['id'])
-                if topics:
-                    all_topics.extend(
-                        [{'group_id': g['id'], 'group_name': g['name'], 'topic_id': t['topic_id'], 'name': t['name']}
-                         for t in topics])
-            except Exception:
-                continue
-        return all_topics
-
-    def update_fetched_topics_list_ui_multi(self, topics):
         self.fetched_topics_listbox.delete(0, tk.END)
-        self.fetched_topics = topics
-        if not topics: return messagebox.showinfo("Информация", "Темы не найдены для загруженных групп.")
-        for t in topics: self.fetched_topics_listbox.insert(tk.END,
-                                                            f"{t['group_name']} → {t['name']} | ID: {t['topic_id']}")
-        messagebox.showinfo("Успех", f"Найдено {len(topics)} тем!")
+        self.fetched_topics = []
+        # по одной фабрике на группу: воркер выполнит их пулом с ограничением параллельности
+        groups = list(self.fetched_groups)
+        factories = [lambda c, g=g: self._fetch_topics_for_group_async(c, g) for g in groups]
+        self.run_in_worker(lambda w: w.submit_pool(factories, TOPICS_POOL_LIMIT, return_exceptions=True),
+                           functools.partial(self._on_topics_batch_fetched, groups),
+                           self.fetch_topics_btn, "🔍  Найти темы")
+
+    async def _fetch_topics_for_group_async(self, client, g):
+        # каждая страница сразу уходит в список на экране, не дожидаясь остальных групп
+        try:
+            async for page in iter_group_topics(client, g['id']):
+                if self._fetch_cancel.is_set(): break
+                if page:
+                    self.root.after(0, self._append_fetched_topics,
+                                    [{'group_id': g['id'], 'group_name': g['name'], 'topic_id': t['topic_id'],
+                                      'name': t['name']} for t in page])
+        except Exception as e:
+            # без доступа к группе закэшированная сущность могла устареть — в следующий раз резолвим заново
+            if _topic_error_template(e) is _TOPIC_ACCESS_ERROR:
+                _entity_cache.pop(g['id'], None)
+            raise
+
+    def _append_fetched_topics(self, topics):
+        self.fetched_topics.extend(topics)
+        self._fill_listbox(self.fetched_topics_listbox,
+                           [f"{t['group_name']} → {t['name']} | ID: {t['topic_id']}" for t in topics], append=True)
+
+    def _on_topics_batch_fetched(self, groups, results):
+        # ошибка одной группы не прерывает остальные: фиксируем её в журнале и показываем в итоге
+        errors = []
+        for g, res in zip(groups, results):
+            if isinstance(res, Exception):
+                msg = describe_topic_error(res, g['id'])
+                _logger.warning("Темы группы %s (%s) не получены: %s", g['name'], g['id'], msg)
+                errors.append(f"{g['name']}: {msg}")
+        report = f"\n\nНе удалось получить темы ({len(errors)}):\n" + "\n".join(errors[:5]) if errors else ""
+        if len(errors) > 5:
+            report += f"\n... и еще {len(errors) - 5}"
+        if not self.fetched_topics:
+            return messagebox.showinfo("Информация", "Темы не найдены для загруженных групп." + report)
+        messagebox.showinfo("Успех", f"Найдено {len(self.fetched_topics)} тем!" + report)
 
     def add_fetched_topics(self):
         sel = self.fetched_topics_listbox.curselection()
         if not sel: return messagebox.showwarning("Внимание", "Выберите темы для добавления!")
-        added = 0
+        added = []
+        existing = {(x['group_id'], x['topic_id']) for x in self.app_data["themes"]}
         for idx in sel:
             t = self.fetched_topics[idx]
-            if not any(
-                    x['topic_id'] == t['topic_id'] and x['group_id'] == t['group_id'] for x in self.app_data["themes"]):
-                self.app_data["themes"].append(
-                    {"group_id": t['group_id'], "topic_id": t['topic_id'], "name": t['name'], "client_number": "",
-                     "tags": [], "custom_templates": {}})
-                added += 1
+            key = (t['group_id'], t['topic_id'])
+            if key not in existing:
+                record = {"group_id": t['group_id'], "topic_id": t['topic_id'], "name": t['name'], "client_number": "",
+                          "tags": [], "custom_templates": {}}
+                self.app_data["themes"].append(record)
+                existing.add(key)
+                added.append(record)
         if added:
-            save_app_data(self.app_data)
-            self.refresh_all_lists()
-            messagebox.showinfo("Успех", f"Добавлено {added} новых тем!")
+            self._schedule_save()
+            self._append_sending_rows(added, False)
+            self._list_append('themes', added)
+            messagebox.showinfo("Успех", f"Добавлено {len(added)} новых тем!")
         else:
             messagebox.showinfo("Информация", "Все выбранные темы уже есть в списке.")
 
-    def fetch_in_thread(self, async_func, callback, btn, btn_text):
-        global TG_WORKER
+    def run_in_worker(self, job, callback, btn, btn_text):
+        """
+        job(worker) ставит запрос в очередь воркера и возвращает Future. Отдельный поток под запрос
+        не нужен: воркер запускается без ожидания входа, а результат возвращается в Tk через after.
+        """
         try:
             TG_WORKER.start(self)
-            result = TG_WORKER.call(async_func)
-            self.root.after(0, callback, result)
+            fut = job(TG_WORKER)
         except Exception as e:
-            _logger.exception("Ошибка в фоне (fetch)")
-            TG_WORKER = TelethonWorker()
-            err_msg = str(e)
-            if isinstance(e, ApiIdInvalidError): err_msg = "Некорректные API ID или API Hash."
-            self.root.after(0, messagebox.showerror, "Ошибка", err_msg)
-        finally:
-            self.root.after(0, self._restore_button, btn, btn_text)
+            fut = concurrent.futures.Future()
+            fut.set_exception(e)
+        fut.add_done_callback(lambda f: self.root.after(0, self._on_worker_result, f, callback, btn, btn_text))
+
+    def _on_worker_result(self, fut, callback, btn, btn_text):
+        global TG_WORKER
+        self._restore_button(btn, btn_text)
+        try:
+            result = fut.result()
+        except Exception as e:
+            _logger.error("Ошибка в фоне (fetch)", exc_info=e)
+            if _worker_needs_restart(TG_WORKER, e):
+                TG_WORKER = TelethonWorker()
+            return messagebox.showerror("Ошибка", describe_error(e))
+        callback(result)
 
     def _restore_button(self, btn, text):
         try:
@@ -1459,20 +2425,39 @@ class TelegramSenderApp:
 
     # -- Sending Page Logic --
     def select_all(self):
-        for var, _ in getattr(self, 'group_vars', []) + getattr(self, 'theme_vars', []): var.set(True)
+        # один вызов на список, независимо от числа строк
+        for state in getattr(self, '_recipient_rows', {}).values():
+            state['listbox'].selection_set(0, tk.END)
+            self._sync_recipient_selection(state)
 
     def deselect_all(self):
-        for var, _ in getattr(self, 'group_vars', []) + getattr(self, 'theme_vars', []): var.set(False)
+        # снимаем выбор и со скрытых фильтром строк, иначе они вернутся выбранными при смене фильтра
+        for state in getattr(self, '_recipient_rows', {}).values():
+            state['listbox'].selection_clear(0, tk.END)
+            state['selected'].clear()
 
     def log(self, message):
         _logger.info(message)
-        self.root.after(0, self._log_threadsafe, message)
-
-    def _log_threadsafe(self, message):
-        self.log_text.configure(state='normal')
-        self.log_text.insert(tk.END, message + "\n");
-        self.log_text.see(tk.END)
-        self.log_text.configure(state='disabled')
+        # строки копятся и выводятся пачкой не чаще раза в LOG_FLUSH_MS: один after на серию сообщений
+        with self._log_lock:
+            self._log_pending.append(message)
+            if len(self._log_pending) > 1:
+                return
+        self.root.after(self.LOG_FLUSH_MS, self._log_threadsafe)
+
+    def _log_threadsafe(self):
+        with self._log_lock:
+            lines = list(self._log_pending)
+            self._log_pending.clear()
+        txt = self.log_text
+        txt.configure(state='normal')
+        txt.insert(tk.END, "\n".join(lines) + "\n")
+        # кольцевой буфер: в журнале остаются только последние LOG_MAX_LINES строк
+        excess = int(txt.index('end-1c').split('.')[0]) - self.LOG_MAX_LINES
+        if excess > 0:
+            txt.delete('1.0', f'{excess + 1}.0')
+        txt.see(tk.END)
+        txt.configure(state='disabled')
 
     def prepare_send(self):
         if self.is_sending: return messagebox.showwarning("Внимание", "Отправка уже выполняется!")
@@ -1480,8 +2465,8 @@ class TelegramSenderApp:
             messagebox.showwarning("Внимание", "Настройте API ключи!");
             return self.notebook.select(0)
 
-        selected_groups = [g for var, g in getattr(self, 'group_vars', []) if var.get()]
-        selected_themes = [t for var, t in getattr(self, 'theme_vars', []) if var.get()]
+        selected_groups = self._selected_recipients('group')
+        selected_themes = self._selected_recipients('theme')
 
         if not selected_groups and not selected_themes: return messagebox.showwarning("Внимание",
                                                                                       "Выберите получателей!")
@@ -1499,11 +2484,10 @@ class TelegramSenderApp:
         dialog.transient(self.root);
         dialog.grab_set()
         width, height = 700, 600
-        x, y = (self.root.winfo_screenwidth() - width) // 2, (self.root.winfo_screenheight() - height) // 2
-        dialog.geometry(f"{width}x{height}+{x}+{y}")
+        self._center_window(dialog, width, height)
         dialog.grid_columnconfigure(0, weight=1)
 
-        tk.Label(dialog, text="Подтверждение отправки", bg=self.colors['bg'], font=('Segoe UI', 14, 'bold')).grid(row=0,
+        tk.Label(dialog, text="Подтверждение отправки", bg=self.colors['bg'], font=self._fonts['display']).grid(row=0,
                                                                                                                   column=0,
                                                                                                                   pady=(
                                                                                                                       20,
@@ -1516,26 +2500,33 @@ class TelegramSenderApp:
         current_tpl_name = getattr(self, 'current_template_name', None)
         recipient_entries, entry_widgets = [], []
 
-        all_recipients = [('group', g) for g in selected_groups] + [('theme', t) for t in selected_themes]
-
+        # один и тот же чат (или тема) получает сообщение один раз, даже если выбран повторно
+        all_recipients, seen = [], set()
+        for type, data in [('group', g) for g in selected_groups] + [('theme', t) for t in selected_themes]:
+            key = (data['id'], None) if type == 'group' else (data['group_id'], data.get('topic_id'))
+            if key not in seen:
+                seen.add(key)
+                all_recipients.append((type, data))
+        dropped = len(selected_groups) + len(selected_themes) - len(all_recipients)
+
+        # строка на каждого получателя: атрибуты берём в локальные переменные вне цикла
+        card_bg, bold_font = self.colors['card'], self._fonts['bold']
+        replace_vars, mk_text = self.replace_vars, self.mk_text
         for i, (type, data) in enumerate(all_recipients):
             override = data.get('custom_templates', {}).get(current_tpl_name) if current_tpl_name else None
-            msg_text = self.replace_vars(override if override is not None else message)
+            msg_text = replace_vars(override if override is not None else message)
             recipient_entries.append({'type': type, 'data': data, 'message': msg_text})
 
-            row = tk.Frame(scrollable_area, bg=self.colors['card'], relief='solid', bd=1)
+            row = tk.Frame(scrollable_area, bg=card_bg, relief='solid', bd=1)
             row.grid(row=i, column=0, sticky='ew', pady=4)
             row.columnconfigure(0, weight=1)
-            tk.Label(row, text=data['name'], bg=self.colors['card'], font=('Segoe UI', 10, 'bold')).grid(row=0,
-                                                                                                         column=0,
-                                                                                                         sticky='ew',
-                                                                                                         padx=6,
-                                                                                                         pady=(4, 2))
+            row.rowconfigure(1, weight=1)
+            tk.Label(row, text=data['name'], bg=card_bg, font=bold_font).grid(row=0, column=0, sticky='ew',
+                                                                              padx=6, pady=(4, 2))
 
-            txt_frame, txt = self.mk_text(row)
+            txt_frame, txt = mk_text(row)
             txt_frame.grid(row=1, column=0, sticky='nsew', padx=6, pady=(0, 6))
-            row.rowconfigure(1, weight=1)
-            txt.insert('1.0', msg_text);
+            txt.insert('1.0', msg_text)
             entry_widgets.append(txt)
 
         if self.attachments:
@@ -1545,7 +2536,7 @@ class TelegramSenderApp:
             attach_card.columnconfigure(0, weight=1)
             list_frame, attach_list = self.mk_listbox(attach_card)
             list_frame.grid(row=0, column=0, sticky='nsew')
-            for path in self.attachments: attach_list.insert(tk.END, os.path.basename(path))
+            self._fill_listbox(attach_list, [os.path.basename(path) for path in self.attachments])
             attach_list.config(state='disabled')
 
         btn_frame = tk.Frame(dialog, bg=self.colors['bg']);
@@ -1558,11 +2549,16 @@ class TelegramSenderApp:
                 if not msg_txt and not self.attachments:
                     return messagebox.showwarning("Внимание",
                                                   f"Сообщение для '{rec['data']['name']}' не может быть пустым!")
-                custom_msgs.append({'type': rec['type'], 'data': rec['data'], 'message': msg_txt})
+                data = rec['data']
+                custom_msgs.append({'type': rec['type'], 'data': data, 'message': msg_txt,
+                                    'display_name': f"{data['name']} (клиент: {data.get('client_number', 'N/A')})"})
             self.confirm_and_send(dialog, custom_msgs)
 
         self.create_button(btn_frame, "✓  Отправить", confirm, variant='success').grid(row=0, column=0, padx=10)
         self.create_button(btn_frame, "✗  Отмена", dialog.destroy, variant='secondary').grid(row=0, column=1, padx=10)
+        if dropped:
+            tk.Label(dialog, text=f"Повторяющиеся получатели пропущены: {dropped}", bg=self.colors['bg'],
+                     fg=self.colors['text_light'], font=self._fonts['small']).grid(row=4, column=0, pady=(0, 10))
 
     def confirm_and_send(self, dialog, custom_messages):
         dialog.destroy()
@@ -1570,61 +2566,92 @@ class TelegramSenderApp:
         self.send_btn.state(['disabled']);
         self.send_btn.config(text="⏳ Идет отправка...")
         self.log("🚀 Начинаю отправку...\n")
-        threading.Thread(target=self.send_in_thread, daemon=True,
-                         args=(list(self.attachments), custom_messages)).start()
-
-    def send_in_thread(self, attachments, custom_messages):
-        global TG_WORKER
+        self.log("🔌 Подключение к Telegram...")
+        # рассылка — обычный вызов в очереди воркера: отдельный поток не ждет ее целиком,
+        # и запросы вкладки загрузки выполняются параллельно с отправкой
         try:
-            self.log("🔌 Подключение к Telegram...")
             TG_WORKER.start(self)
-            self.log("✓ Успешно подключено!")
-            rate_delay = self.config.get("rate_delay", 10)
-
-            async def _send_all(client):
-                success, failed = 0, 0
-                for entry in custom_messages:
-                    try:
-                        data, msg_text = entry['data'], entry['message']
-                        recipient_id = data['id'] if entry['type'] == 'group' else data['group_id']
-                        reply_to = data.get('topic_id') if entry['type'] == 'theme' else None
-                        name = f"{data['name']} (клиент: {data.get('client_number', 'N/A')})"
-
-                        if attachments:
-                            await client.send_file(recipient_id, file=attachments,
-                                                   caption=msg_text if msg_text else None, reply_to=reply_to)
-                        elif msg_text:
-                            await client.send_message(recipient_id, message=msg_text, reply_to=reply_to)
-
-                        self.log(f"✓ Отправлено: {name}")
-                        success += 1
-                        await asyncio.sleep(rate_delay)
-                    except Exception as e:
-                        self.log(f"✗ Ошибка {name}: {e}")
-                        _logger.exception("Ошибка отправки")
-                        failed += 1
-                return success, failed
-
-            success, failed = TG_WORKER.call(_send_all)
-
-            self.log(f"\n{'=' * 30} 📊 ИТОГО: ✓ {success} | ✗ {failed} {'=' * 30}\n")
-
-            if failed == 0:
-                self.root.after(0, messagebox.showinfo, "Успех",
-                                f"Все сообщения успешно отправлены!\nОтправлено: {success}")
-            else:
-                self.root.after(0, messagebox.showwarning, "Завершено с ошибками",
-                                f"Отправлено: {success}\nОшибок: {failed}")
+            fut = TG_WORKER.submit(self._make_send_job(list(self.attachments), custom_messages))
+        except Exception as e:
+            fut = concurrent.futures.Future()
+            fut.set_exception(e)
+        fut.add_done_callback(lambda f: self.root.after(0, self._on_send_done, f))
+
+    def _make_send_job(self, attachments, custom_messages):
+        rate_delay = self.config.get("rate_delay", 10)
+
+        async def _send_all(client):
+            from telethon.errors import FloodWaitError
 
+            # вызов попадает в цикл воркера только после входа
+            self.log("✓ Успешно подключено!")
+            # задержка из настроек задает интервал между началами отправок, но не меньше SEND_MIN_INTERVAL;
+            # время ответа сервера к задержке не прибавляется
+            limiter = _RateLimiter(1 / max(rate_delay, SEND_MIN_INTERVAL))
+
+            # каждый получатель разрешается один раз до рассылки, а не внутри каждой отправки;
+            # при ошибке разрешения отправка получит исходный ID и сообщит об ошибке сама
+            ids = list({e['data']['id'] if e['type'] == 'group' else e['data']['group_id'] for e in custom_messages})
+            resolved = await asyncio.gather(*(client.get_input_entity(i) for i in ids), return_exceptions=True)
+            peers = {i: p for i, p in zip(ids, resolved) if not isinstance(p, BaseException)}
+
+            # вложения загружаются на сервер один раз, всем получателям уходят ссылки на загруженные файлы
+            files = attachments
+            if attachments:
+                self.log(f"📤 Загрузка вложений ({len(attachments)})...")
+                files = await asyncio.gather(*(client.upload_file(p) for p in attachments))
+
+            async def _send_one(entry, _client):
+                data, msg_text, name = entry['data'], entry['message'], entry['display_name']
+                try:
+                    recipient_id = data['id'] if entry['type'] == 'group' else data['group_id']
+                    recipient_id = peers.get(recipient_id, recipient_id)
+                    reply_to = data.get('topic_id') if entry['type'] == 'theme' else None
+                    while True:
+                        await limiter.acquire()
+                        try:
+                            if attachments:
+                                await _client.send_file(recipient_id, file=files,
+                                                        caption=msg_text if msg_text else None, reply_to=reply_to)
+                            elif msg_text:
+                                await _client.send_message(recipient_id, message=msg_text, reply_to=reply_to)
+                            break
+                        except FloodWaitError as e:
+                            # лимит превышен: останавливаем всю рассылку на указанное время и повторяем
+                            self.log(f"⏳ Ограничение Telegram, пауза {e.seconds} сек.")
+                            limiter.pause(e.seconds)
+
+                    self.log(f"✓ Отправлено: {name}")
+                    return True
+                except Exception as e:
+                    self.log(f"✗ Ошибка {name}: {e}")
+                    _logger.exception("Ошибка отправки")
+                    return False
+
+            factories = [functools.partial(_send_one, entry) for entry in custom_messages]
+            results = await _run_pool(client, factories, SEND_CONCURRENCY)
+            success = sum(results)
+            return success, len(results) - success
+
+        return _send_all
+
+    def _on_send_done(self, fut):
+        global TG_WORKER
+        self.is_sending = False
+        self._restore_button(self.send_btn, "📨  Отправить сообщения")
+        try:
+            success, failed = fut.result()
         except Exception as e:
-            _logger.exception("Ошибка при отправке")
-            TG_WORKER = TelethonWorker()
-            err_msg = str(e)
-            if isinstance(e, ApiIdInvalidError): err_msg = "Некорректные API ID или API Hash."
-            self.root.after(0, messagebox.showerror, "Ошибка", err_msg)
-        finally:
-            self.is_sending = False
-            self.root.after(0, self._restore_button, self.send_btn, "📨  Отправить сообщения")
+            _logger.error("Ошибка при отправке", exc_info=e)
+            if _worker_needs_restart(TG_WORKER, e):
+                TG_WORKER = TelethonWorker()
+            return messagebox.showerror("Ошибка", describe_error(e))
+
+        self.log(f"\n{'=' * 30} 📊 ИТОГО: ✓ {success} | ✗ {failed} {'=' * 30}\n")
+        if failed == 0:
+            messagebox.showinfo("Успех", f"Все сообщения успешно отправлены!\nОтправлено: {success}")
+        else:
+            messagebox.showwarning("Завершено с ошибками", f"Отправлено: {success}\nОшибок: {failed}")
 
 
 # ============================================